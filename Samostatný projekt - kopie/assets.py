@@ -0,0 +1,200 @@
+import os
+import struct
+import threading
+import time
+import zlib
+
+import pygame
+
+from atlas import SpriteAtlas
+
+# === ASSET CACHE ===
+# Every image is decoded, converted and scaled once per (path, size, format)
+# and the same Surface is handed to every entity that asks for it.
+#
+# The scaled pixels also go to cache_dir, so the next start only reads raw
+# bytes back with pygame.image.frombuffer() instead of decoding and scaling
+# the PNG. A cached file is used only while the source's mtime and size and
+# the target size still match its header.
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".asset_cache")
+CACHE_HEADER = struct.Struct("<4sqqHH?")  # magic, source mtime_ns, source bytes, width, height, alpha
+CACHE_MAGIC = b"ZPIX"
+
+class AssetCache:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.surfaces = {}
+        self.atlases = {}
+        self.fonts = {}
+        self.cache_dir = cache_dir
+        self.lock = threading.RLock()  # preload() fills the cache from another thread
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.preload_ms = 0.0
+
+    def image(self, path, size=None, alpha=True):
+        key = (path, tuple(size) if size else None, alpha)
+        if key in self.surfaces:
+            self.hits += 1
+            return self.surfaces[key]
+
+        with self.lock:
+            if key in self.surfaces:  # loaded while we waited
+                self.hits += 1
+                return self.surfaces[key]
+            self.misses += 1
+            try:
+                surf = self.load(path, key[1], alpha)
+            except OSError:
+                surf = None  # missing file, entities fall back to circles
+            except pygame.error:
+                return None  # no display mode yet, don't remember the failure
+            self.surfaces[key] = surf
+            return surf
+
+    def load(self, path, size, alpha):
+        stat = os.stat(path)
+        mode = "RGBA" if alpha else "RGB"
+        cache_path = self.cache_path(path, size, alpha)
+        surf = self.read_cached(cache_path, stat, size, alpha, mode)
+        if surf is None:
+            surf = pygame.image.load(path)
+            surf = surf.convert_alpha() if alpha else surf.convert()
+            if size:
+                surf = pygame.transform.scale(surf, size)
+            self.write_cached(cache_path, stat, surf, alpha, mode)
+            return surf
+        self.disk_hits += 1
+        return surf.convert_alpha() if alpha else surf.convert()
+
+    def cache_path(self, path, size, alpha, variant=""):
+        if not self.cache_dir:
+            return None
+        name = os.path.splitext(os.path.basename(path))[0]
+        tag = zlib.crc32(os.path.abspath(path).encode())
+        w, h = size or (0, 0)
+        return os.path.join(self.cache_dir, f"{name}-{tag:08x}-{w}x{h}-{'a' if alpha else 'o'}{variant}.pix")
+
+    @staticmethod
+    def read_cached(cache_path, stat, size, alpha, mode):
+        if not cache_path:
+            return None
+        try:
+            with open(cache_path, "rb") as f:
+                header = f.read(CACHE_HEADER.size)
+                if len(header) < CACHE_HEADER.size:
+                    return None
+                magic, mtime, nbytes, w, h, cached_alpha = CACHE_HEADER.unpack(header)
+                if (magic != CACHE_MAGIC or mtime != stat.st_mtime_ns or nbytes != stat.st_size or
+                        cached_alpha != alpha or (size and (w, h) != tuple(size))):
+                    return None
+                pixels = f.read()
+        except OSError:
+            return None
+        if len(pixels) != w * h * len(mode):
+            return None
+        # frombuffer() wraps the bytes without a copy; callers convert() the
+        # surface right away, which makes the copy they keep
+        return pygame.image.frombuffer(pixels, (w, h), mode)
+
+    @staticmethod
+    def write_cached(cache_path, stat, surf, alpha, mode):
+        if not cache_path:
+            return
+        w, h = surf.get_size()
+        header = CACHE_HEADER.pack(CACHE_MAGIC, stat.st_mtime_ns, stat.st_size, w, h, alpha)
+        tmp = f"{cache_path}.{os.getpid()}.tmp"  # batch workers may race on the same file
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(header)
+                f.write(pygame.image.tobytes(surf, mode))
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass  # read-only checkout, just decode again next time
+
+    # Pre-transformed headings and frames of a sprite, see atlas.py; spec
+    # is the SpriteAtlas keyword arguments. None while the image is missing.
+    # Baked sheets go to the disk cache like scaled sprites, keyed by
+    # SpriteAtlas.bake_key(), so a changed default or bake() doesn't bring
+    # back an old sheet.
+    # scale shrinks size for drawing at a lower internal resolution.
+    def atlas(self, path, size=None, scale=1.0, **spec):
+        if scale != 1.0:
+            size = (max(1, round(size[0] * scale)), max(1, round(size[1] * scale)))
+        key = (path, tuple(size) if size else None, tuple(sorted(spec.items())))
+        if key in self.atlases:
+            return self.atlases[key]
+        with self.lock:
+            if key in self.atlases:  # baked while we waited
+                return self.atlases[key]
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self.atlases[key] = None  # missing file, entities fall back to circles
+                return None
+            try:
+                bake_key = repr(SpriteAtlas.bake_key(**spec)).encode()
+                cache_path = self.cache_path(path, key[1], True, f"-atlas{zlib.crc32(bake_key):08x}")
+                sheet = self.read_cached(cache_path, stat, None, True, "RGBA")
+                if sheet is not None:
+                    self.disk_hits += 1
+                    atlas = SpriteAtlas(None, sheet=sheet.convert_alpha(), **spec)
+                else:
+                    image = self.image(path, size)
+                    if image is None:
+                        return None
+                    atlas = SpriteAtlas(image, **spec)
+                    self.write_cached(cache_path, stat, atlas.surface, True, "RGBA")
+            except pygame.error:
+                return None  # no display mode yet, don't remember the failure
+            self.atlases[key] = atlas
+            return atlas
+
+    def atlas_report(self):
+        lines = []
+        total = 0
+        for (path, size, spec), atlas in self.atlases.items():
+            if atlas is None:
+                continue
+            w, h = atlas.surface.get_size()
+            total += atlas.memory()
+            lines.append(f"{path:<16} {atlas.rotations:>2} headings x {atlas.frames} frames, "
+                         f"cell {atlas.cell_w}x{atlas.cell_h}, sheet {w}x{h}, {atlas.memory() / 1024:8.0f} KiB")
+        lines.append(f"{'atlases':<16} {total / 1024:8.0f} KiB total")
+        return "\n".join(lines)
+
+    def font(self, name, size):
+        # SysFont with a name scans the system font list, which is slow
+        key = (name, size)
+        if key not in self.fonts:
+            with self.lock:
+                if key not in self.fonts:
+                    self.fonts[key] = pygame.font.SysFont(name, size)
+        return self.fonts[key]
+
+    # Load images [(path, size), ...], atlases [(path, size, spec), ...] and
+    # fonts [(name, size), ...] on a background thread; join() the returned
+    # thread before relying on them.
+    def preload(self, images=(), fonts=(), atlases=()):
+        def run():
+            start = time.perf_counter()
+            for path, size in images:
+                self.image(path, size)
+            for path, size, spec in atlases:
+                self.atlas(path, size, **spec)
+            for name, size in fonts:
+                self.font(name, size)
+            self.preload_ms = (time.perf_counter() - start) * 1000
+        thread = threading.Thread(target=run, name="asset-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def clear(self):
+        self.surfaces.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "disk_hits": self.disk_hits,
+                "entries": len(self.surfaces)}
+
+assets = AssetCache()
@@ -0,0 +1,129 @@
+import inspect
+import math
+
+import numpy as np
+import pygame
+
+# === SPRITE ATLAS ===
+# Every heading bucket and animation frame of one sprite, transformed once
+# at load time and packed into a single surface: one column per heading
+# bucket, one row per frame. cell(bucket, frame) is a subsurface of it, so
+# drawing a turned, animated sprite is a plain blit.
+#
+# Rotated art is mostly transparent corners, so each variant is cropped to
+# its visible pixels. A slot is only as large as the furthest visible
+# pixel from the sprite's centre needs, and each cell is the opaque part
+# of its slot; offsets[i] is where cell i's top-left sits relative to the
+# sprite's centre, draw() and the renderer's batches blit it there. The
+# cells are found again from the pixels, so a cached sheet needs nothing
+# else stored with it.
+#
+# Headings are screen angles (0 = right, 90 = down) split into `rotations`
+# buckets. mode "rotate" turns the art all the way round (top-down art,
+# fireballs); facing is the heading the art is drawn with. mode "mirror"
+# is for side-view art: it is flipped to face left or right and leans up
+# to max_tilt degrees into vertical movement. The art has no walk cycles,
+# so frames are a squash-and-stretch bob of bob * height, played at fps.
+# A sheet baked earlier (the asset cache keeps them on disk) can be passed
+# in instead of baking it again from image; bake_key() names what such a
+# sheet was baked with. Bump BAKE_VERSION whenever bake() draws differently.
+BAKE_VERSION = 2
+
+class SpriteAtlas:
+    def __init__(self, image, rotations=16, frames=1, mode="rotate", facing=0, max_tilt=15, bob=0.06, fps=8,
+                 sheet=None):
+        self.rotations = rotations
+        self.frames = frames
+        self.fps = fps
+        self.mode = mode
+        self.facing = facing
+        self.max_tilt = max_tilt
+        self.bob = bob
+
+        if sheet is None:
+            sheet = self.bake(image)
+        self.surface = sheet
+        self.cell_w = sheet.get_width() // rotations  # slot size; the sprite's centre is the slot's
+        self.cell_h = sheet.get_height() // frames
+        self.cells = []  # frame * rotations + bucket -> subsurface
+        self.offsets = []
+        half_w, half_h = self.cell_w // 2, self.cell_h // 2
+        for row in range(frames):
+            for col in range(rotations):
+                slot = pygame.Rect(col * self.cell_w, row * self.cell_h, self.cell_w, self.cell_h)
+                visible = sheet.subsurface(slot).get_bounding_rect()
+                if not visible.w:
+                    visible = pygame.Rect(half_w, half_h, 1, 1)  # nothing drawn, keep a blittable cell
+                self.cells.append(sheet.subsurface(visible.move(slot.topleft)))
+                self.offsets.append((visible.x - half_w, visible.y - half_h))
+        self.offset_x = np.array([x for x, _ in self.offsets], dtype=np.int64)
+        self.offset_y = np.array([y for _, y in self.offsets], dtype=np.int64)
+
+    @classmethod
+    def bake_key(cls, **spec):
+        # Format version and every parameter, defaults included
+        params = inspect.signature(cls).bind(None, **spec)
+        params.apply_defaults()
+        args = {name: value for name, value in params.arguments.items() if name not in ("image", "sheet")}
+        return (BAKE_VERSION,) + tuple(sorted(args.items()))
+
+    def bake(self, image):
+        variants = [self.variant(image, r, f) for f in range(self.frames) for r in range(self.rotations)]
+        # visible part of each variant, and how far it reaches left/up of the centre
+        boxes = []
+        half_w = half_h = 1
+        for v in variants:
+            box = v.get_bounding_rect()
+            cx, cy = v.get_width() // 2, v.get_height() // 2
+            boxes.append((box, cx - box.left, cy - box.top))
+            if box.w:
+                half_w = max(half_w, cx - box.left, box.right - cx)
+                half_h = max(half_h, cy - box.top, box.bottom - cy)
+        cell_w, cell_h = 2 * half_w, 2 * half_h
+        sheet = pygame.Surface((cell_w * self.rotations, cell_h * self.frames), pygame.SRCALPHA, image)
+        sheet.fill((0,0,0,0))
+        for i, (v, (box, left, up)) in enumerate(zip(variants, boxes)):
+            col, row = i % self.rotations, i // self.rotations
+            sheet.blit(v, (col * cell_w + half_w - left, row * cell_h + half_h - up), box)
+        return sheet
+
+    def variant(self, image, bucket, frame):
+        heading = 360 * bucket / self.rotations
+        if self.frames > 1 and self.bob:
+            w, h = image.get_size()
+            stretch = 1 + self.bob * math.sin(2 * math.pi * frame / self.frames)
+            image = pygame.transform.smoothscale(image, (w, max(1, round(h * stretch))))
+        if self.mode == "rotate":
+            return pygame.transform.rotozoom(image, self.facing - heading, 1)
+        rad = math.radians(heading)
+        art_right = math.cos(math.radians(self.facing)) > 0
+        go_right = math.cos(rad) > 1e-9
+        if art_right != go_right:
+            image = pygame.transform.flip(image, True, False)
+        tilt = self.max_tilt * math.sin(rad)  # nose down when heading down
+        return pygame.transform.rotozoom(image, -tilt if go_right else tilt, 1)
+
+    def bucket(self, dx, dy):
+        return int(round(math.atan2(dy, dx) / (2 * math.pi) * self.rotations)) % self.rotations
+
+    def buckets(self, dx, dy):
+        return np.rint(np.arctan2(dy, dx) * (self.rotations / (2 * math.pi))).astype(np.int64) % self.rotations
+
+    def frame_at(self, t):
+        return int(t * self.fps) % self.frames
+
+    def index(self, bucket, frame=0):
+        return frame % self.frames * self.rotations + bucket
+
+    def cell(self, bucket, frame=0):
+        return self.cells[self.index(bucket, frame)]
+
+    def draw(self, surface, bucket, frame, cx, cy):
+        # Blit one variant with the sprite's centre at (cx, cy)
+        i = self.index(bucket, frame)
+        x, y = self.offsets[i]
+        return surface.blit(self.cells[i], (cx + x, cy + y))
+
+    def memory(self):
+        w, h = self.surface.get_size()
+        return w * h * self.surface.get_bytesize()
@@ -0,0 +1,183 @@
+import argparse
+import csv
+import itertools
+import math
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import headless
+from headless import KeyState, NO_KEYS, ScriptedPath, parse_path, path_script
+from main import World, TUNING
+
+# === BOT PLAYERS ===
+# Kiting bot: every few ticks look at the nearest zombies and hold the WASD
+# keys that lead away from them, drifting back to the middle when nothing
+# is close.
+def keys_toward(dx, dy, dead_zone=0.35):
+    length = math.hypot(dx, dy)
+    if length < 1e-6:
+        return NO_KEYS
+    dx /= length
+    dy /= length
+    letters = ""
+    if dx > dead_zone: letters += "d"
+    if dx < -dead_zone: letters += "a"
+    if dy > dead_zone: letters += "s"
+    if dy < -dead_zone: letters += "w"
+    return KeyState(letters)
+
+class KiteBot:
+    def __init__(self, think_every=6, look=8, danger=700):
+        self.think_every = think_every
+        self.look = look
+        self.danger = danger
+        self.keys = NO_KEYS
+
+    def keys_for(self, world):
+        if world.ticks % self.think_every:
+            return self.keys
+        player, level = world.player, world.level
+        flee_x = flee_y = 0.0
+        for z in world.enemies.nearest(player.x, player.y, self.look):
+            dx, dy = player.x - z.x, player.y - z.y
+            d2 = dx * dx + dy * dy
+            if d2 < self.danger * self.danger:
+                flee_x += dx / max(d2, 1.0)
+                flee_y += dy / max(d2, 1.0)
+        if flee_x or flee_y:
+            # lean back towards the middle so the bot doesn't pin itself to a wall
+            flee_x += (level.width / 2 - player.x) * 1e-7
+            flee_y += (level.height / 2 - player.y) * 1e-7
+            self.keys = keys_toward(flee_x, flee_y)
+        else:
+            self.keys = keys_toward(level.width / 2 - player.x, level.height / 2 - player.y, 0.9)
+        return self.keys
+
+class IdleBot:
+    def keys_for(self, world):
+        return NO_KEYS
+
+class PathBot:
+    def __init__(self, path):
+        self.path = ScriptedPath(parse_path(path))
+
+    def keys_for(self, world):
+        return self.path.keys_at(world.time)
+
+def make_bot(name, path):
+    if name == "kite":
+        return KiteBot()
+    if name == "path":
+        return PathBot(path)
+    return IdleBot()
+
+# === ONE GAME ===
+def play(task):
+    params, seed, bot_name, path, dt, max_time = task
+    world = World(seed=seed, **params)
+    bot = make_bot(bot_name, path)
+    max_ticks = int(max_time / dt)
+    start = time.perf_counter()
+    while world.ticks < max_ticks and not world.game_over:
+        world.step(dt, bot.keys_for(world))
+    player = world.player
+    return {
+        "params": params,
+        "seed": seed,
+        "survival_s": round(world.time, 3),
+        "died": world.game_over,
+        "kills": player.kills,
+        "level": player.level,
+        "wall_s": time.perf_counter() - start,
+    }
+
+# === SWEEP ===
+def parse_grid(specs):
+    # ["fire_decay=0.9,0.95", "zombie_speed=200,250"] -> list of param dicts
+    axes = []
+    for spec in specs:
+        name, values = spec.split("=", 1)
+        if name not in TUNING:
+            raise SystemExit(f"unknown parameter {name!r}, choose from: {', '.join(TUNING)}")
+        axes.append([(name, float(v)) for v in values.split(",")])
+    return [dict(combo) for combo in itertools.product(*axes)]
+
+def summarize(results):
+    rows = {}
+    for r in results:
+        key = tuple(sorted(r["params"].items()))
+        rows.setdefault(key, []).append(r)
+    table = []
+    for key, runs in rows.items():
+        survival = [r["survival_s"] for r in runs]
+        row = dict(key)
+        row.update({
+            "games": len(runs),
+            "deaths": sum(r["died"] for r in runs),
+            "survival_mean": round(statistics.fmean(survival), 2),
+            "survival_median": round(statistics.median(survival), 2),
+            "kills_mean": round(statistics.fmean(r["kills"] for r in runs), 2),
+            "level_mean": round(statistics.fmean(r["level"] for r in runs), 2),
+            "level_max": max(r["level"] for r in runs),
+        })
+        table.append(row)
+    return table
+
+def print_table(table):
+    if not table:
+        return
+    fields = list(table[0])
+    widths = [max(len(f), *(len(str(row[f])) for row in table)) for f in fields]
+    print("  ".join(f.rjust(w) for f, w in zip(fields, widths)))
+    for row in table:
+        print("  ".join(str(row[f]).rjust(w) for f, w in zip(fields, widths)))
+
+def init_worker():
+    headless.init_headless()
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="Run many seeded headless games over a grid of difficulty constants.")
+    parser.add_argument("grid", nargs="*", help="name=v1,v2,... for any of: " + ", ".join(TUNING))
+    parser.add_argument("--seeds", type=int, default=10, help="games per parameter combination")
+    parser.add_argument("--seed-base", type=int, default=0)
+    parser.add_argument("--bot", choices=("kite", "idle", "path"), default="kite")
+    parser.add_argument("--path", type=path_script, default="d:2,s:2,a:2,w:2", help="WASD script for --bot path")
+    parser.add_argument("--dt", type=float, default=1 / 60)
+    parser.add_argument("--max-time", type=float, default=600, help="seconds of game time before a run is cut off")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", help="write the summary table to this CSV file")
+    parser.add_argument("--runs-out", help="write every single game to this CSV file")
+    args = parser.parse_args(argv)
+
+    combos = parse_grid(args.grid) or [{}]
+    tasks = [(params, args.seed_base + s, args.bot, args.path, args.dt, args.max_time)
+             for params in combos for s in range(args.seeds)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker) as pool:
+        results = list(pool.map(play, tasks, chunksize=max(1, len(tasks) // (args.workers * 4))))
+    wall = time.perf_counter() - start
+
+    table = summarize(results)
+    print_table(table)
+    sim = sum(r["survival_s"] for r in results)
+    print(f"{len(results)} games, {sim:.0f}s of game time in {wall:.1f}s on {args.workers} workers")
+
+    if args.out:
+        with open(args.out, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(table[0]))
+            writer.writeheader()
+            writer.writerows(table)
+    if args.runs_out:
+        with open(args.runs_out, "w", newline="") as f:
+            writer = csv.writer(f)
+            names = sorted({name for r in results for name in r["params"]})
+            writer.writerow(names + ["seed", "survival_s", "died", "kills", "level"])
+            for r in results:
+                writer.writerow([r["params"].get(n) for n in names] +
+                                [r["seed"], r["survival_s"], r["died"], r["kills"], r["level"]])
+    return table
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,95 @@
+from collections import deque
+
+# === FRAME GOVERNOR ===
+# Watches how long recent frames took to produce (everything but the wait
+# for the frame cap) and trades quality for time to hold the frame rate:
+#   - the world layer (level, sprites, particles) is drawn into a smaller
+#     internal surface and scaled up to the screen; the HUD stays native
+#   - the particle emission budget shrinks
+#   - the LOD scheduler simulates a narrower near region and steps mid
+#     zombies less often
+# It steps one level down once the mean of the last `window` frames is
+# over budget, and one level back up after up_after frames in a row with
+# every frame under `headroom` of the budget. A step up that has to be
+# undone soon after doubles up_after, so a machine right at the edge
+# doesn't flip between two levels.
+#
+# The render backend (render.py) owns the smaller target and the upscale.
+# On the Surface path that is pygame.transform.scale(); smoothscale()
+# looks better but costs ~10 ms per 1080p frame here, more than the
+# smaller layer saves.
+LEVELS = (
+    # render scale, particles per frame, LOD near margin, LOD mid_every
+    (1.0, 600, 960, 4),
+    (0.75, 300, 720, 6),
+    (0.5, 120, 480, 8),
+)
+
+class FrameGovernor:
+    def __init__(self, frame_ms=1000 / 60, window=30, headroom=0.7, up_after=120, levels=LEVELS,
+                 smooth=False, sim_budgets=True):
+        self.frame_ms = frame_ms
+        self.frames = deque(maxlen=window)
+        self.headroom = headroom
+        self.up_after = up_after
+        self.max_up_after = up_after * 32
+        self.levels = levels
+        self.smooth = smooth
+        self.sim_budgets = sim_budgets  # off while recording or replaying, LOD changes the simulation
+        self.level = 0
+        self.calm = 0  # frames in a row under headroom
+        self.since_up = None  # frames since the last step up
+        self.changes = 0
+
+    @property
+    def scale(self):
+        return self.levels[self.level][0]
+
+    def observe(self, work_ms):
+        # Returns True when the level changed, apply() it then
+        frames = self.frames
+        frames.append(work_ms)
+        self.calm = self.calm + 1 if work_ms < self.frame_ms * self.headroom else 0
+        if self.since_up is not None:
+            self.since_up += 1
+        if len(frames) < frames.maxlen:
+            return False
+
+        if sum(frames) / len(frames) > self.frame_ms and self.level < len(self.levels) - 1:
+            if self.since_up is not None and self.since_up < 4 * frames.maxlen:
+                self.up_after = min(self.up_after * 2, self.max_up_after)
+            self.since_up = None
+            return self.set_level(self.level + 1)
+        if self.calm >= self.up_after and self.level > 0:
+            self.since_up = 0
+            return self.set_level(self.level - 1)
+        return False
+
+    def set_level(self, level):
+        self.level = level
+        self.frames.clear()  # judge the new level on its own frames
+        self.calm = 0
+        self.changes += 1
+        return True
+
+    def apply(self, world):
+        _, particles, near_margin, mid_every = self.levels[self.level]
+        if world.particles is not None:
+            world.particles.budget = particles
+        if world.lod and self.sim_budgets:
+            world.lod.configure(near_margin, mid_every)
+
+    def world_surface(self, backend):
+        # Where the world layer goes this frame: the screen itself at full
+        # scale, else a smaller target that upscale() stretches over it
+        return backend.layer(self.scale, self.smooth)
+
+    def upscale(self, layer, backend):
+        backend.compose(layer, self.smooth)
+
+    # Sprites for every level below full scale, for preload() to bake
+    # before the governor needs them
+    def scaled_sprites(self, sprites):
+        return [(path, size, dict(spec, scale=level[0]))
+                for level in self.levels if level[0] != 1.0
+                for path, size, spec in sprites]
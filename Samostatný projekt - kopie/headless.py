@@ -0,0 +1,249 @@
+import argparse
+import json
+import math
+import os
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+import main
+import snapshot
+from main import World
+from profiler import FrameProfiler
+from replay import InputRecorder, Replay
+
+# === SCRIPTED INPUT ===
+# Stands in for pygame.key.get_pressed(): keys[pygame.K_w] etc.
+class KeyState:
+    KEYS = {"w": pygame.K_w, "a": pygame.K_a, "s": pygame.K_s, "d": pygame.K_d}
+
+    def __init__(self, letters=""):
+        self.down = frozenset(self.KEYS[c] for c in letters)
+
+    def __getitem__(self, key):
+        return key in self.down
+
+NO_KEYS = KeyState()
+
+def parse_path(text):
+    # "wd:1.5,s:2,-:1" -> [(KeyState, seconds), ...], "-" means no keys;
+    # ValueError for anything else
+    path = []
+    for part in text.split(","):
+        letters, sep, seconds = part.partition(":")
+        letters = letters.strip().lower().replace("-", "")
+        if not sep:
+            raise ValueError(f"{part.strip()!r} should be keys:seconds")
+        unknown = set(letters) - set(KeyState.KEYS)
+        if unknown:
+            raise ValueError(f"unknown key {''.join(sorted(unknown))!r} in {part.strip()!r}, use w a s d or -")
+        try:
+            seconds = float(seconds)
+        except ValueError:
+            raise ValueError(f"bad duration in {part.strip()!r}") from None
+        if not 0 <= seconds < math.inf:
+            raise ValueError(f"duration in {part.strip()!r} must be 0 or more seconds")
+        path.append((KeyState(letters), seconds))
+    if not sum(seconds for _, seconds in path) > 0:
+        raise ValueError("the path must last longer than 0 seconds")
+    return path
+
+def path_script(text):
+    # argparse type= for --path: checks the script, keeps it as text
+    try:
+        parse_path(text)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(str(err)) from None
+    return text
+
+class ScriptedPath:
+    def __init__(self, path):
+        self.path = path
+        self.total = sum(seconds for _, seconds in path)
+
+    def keys_at(self, t):
+        t = t % self.total
+        for keys, seconds in self.path:
+            if t < seconds:
+                return keys
+            t -= seconds
+        return self.path[-1][0]
+
+    def keys_for(self, world):
+        return self.keys_at(world.time)
+
+# === SCENARIOS ===
+def spawn_ring(world, count, radius):
+    player = world.player
+    for _ in range(count):
+        angle = world.rng.uniform(0, 2 * math.pi)
+        dist = world.rng.uniform(radius * 0.5, radius)
+        x = min(max(player.x + math.cos(angle) * dist, 0), world.level.width)
+        y = min(max(player.y + math.sin(angle) * dist, 0), world.level.height)
+        world.spawn_zombie(x, y)
+
+def setup_world(args):
+    world = World(seed=args.seed, lod=not args.no_lod)
+    if args.snapshot:
+        snapshot.load(world, args.snapshot)
+        world.player.invulnerable |= args.god
+        return world
+    world.player.invulnerable = args.god
+    if args.scenario == "horde":
+        spawn_ring(world, args.zombies, args.radius)
+    elif args.scenario == "spread":
+        for _ in range(args.zombies):
+            world.spawn_zombie(world.rng.uniform(0, world.level.width), world.rng.uniform(0, world.level.height))
+    return world
+
+SCENARIOS = ("idle", "horde", "spread", "path")
+
+# === RUN ===
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    i = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[i]
+
+def world_state(world):
+    player = world.player
+    return {
+        "ticks": world.ticks,
+        "sim_time": round(world.time, 3),
+        "game_over": world.game_over,
+        "player": [round(player.x, 3), round(player.y, 3)],
+        "hp": player.hp,
+        "level": player.level,
+        "xp": player.xp,
+        "kills": player.kills,
+        "zombies": len(world.enemies),
+        "fireballs": len(world.fireballs),
+    }
+
+# inputs is anything with keys_for(world): a ScriptedPath or a Replay
+def run(world, ticks, dt, inputs=None, profiler=None, recorder=None):
+    costs = []
+    perf = time.perf_counter
+    if profiler:
+        world.profiler = profiler
+    peak_allocs = 0
+    start = perf()
+    for _ in range(ticks):
+        keys = inputs.keys_for(world) if inputs else NO_KEYS
+        if profiler:
+            profiler.begin_frame()
+        world.enemies.begin_frame()  # a tick is a frame here
+        t0 = perf()
+        world.step(dt, keys)
+        costs.append(perf() - t0)
+        peak_allocs = max(peak_allocs, world.enemies.view_pool.frame_allocs)
+        if recorder:
+            recorder.record(world, keys)
+        if profiler:
+            counts = {"zombies": len(world.enemies), "fireballs": len(world.fireballs)}
+            counts.update(main.pool_counts(world.enemies))
+            profiler.end_frame(counts)
+        if world.game_over:
+            break
+    wall = perf() - start
+    costs.sort()
+    pool = world.enemies.stats()
+    pool["reuse_rate"] = round(pool["reuse_rate"], 3)
+    pool["peak_frame_allocs"] = peak_allocs
+    return {
+        "wall_s": round(wall, 4),
+        "ticks_per_s": round(len(costs) / wall, 1) if wall > 0 else 0.0,
+        "p50_ms": round(percentile(costs, 0.50) * 1000, 4),
+        "p99_ms": round(percentile(costs, 0.99) * 1000, 4),
+        "max_ms": round(costs[-1] * 1000, 4) if costs else 0.0,
+        "pool": pool,
+        "state": world_state(world),
+    }
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run the game simulation without a window.")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="idle")
+    parser.add_argument("--ticks", type=int, default=3600)
+    parser.add_argument("--dt", type=float, default=1 / main.FPS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--zombies", type=int, default=1000, help="zombies for horde/spread")
+    parser.add_argument("--radius", type=float, default=1500, help="ring radius for horde")
+    parser.add_argument("--path", type=path_script, default="d:2,s:2,a:2,w:2", help="WASD script for path, e.g. 'wd:1.5,-:1'")
+    parser.add_argument("--no-lod", action="store_true", help="step every zombie every tick, however far away")
+    parser.add_argument("--god", action="store_true", help="player takes no damage")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--profile-out", help="write per-tick phase timings to this .csv or .json file")
+    parser.add_argument("--snapshot", help="start from this world snapshot instead of the scenario setup")
+    parser.add_argument("--snapshot-out", help="save the world to this snapshot file after the run")
+    parser.add_argument("--record", help="save seed and per-tick keys to this file")
+    parser.add_argument("--replay", help="re-simulate a recording (from main.py --record or --record here)")
+    parser.add_argument("--verify", action="store_true", help="check the recording's state checksums during --replay")
+    return parser
+
+def init_headless():
+    # No window: the dummy drivers are picked here rather than at import,
+    # so tools that only borrow helpers from this module (render_bench.py)
+    # still get the real video driver
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))  # convert_alpha() needs a video mode
+
+def cli(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.record and (args.scenario not in ("idle", "path") or args.god or args.snapshot):
+        # a replay starts from World(seed) like main() does
+        parser.error("--record needs the idle or path scenario without --god")
+    init_headless()
+    profiler = FrameProfiler(main.SIM_PHASES, record=True) if args.profile_out else None
+    replay = recorder = None
+    if args.replay:
+        # same world main() plays in, fed the recorded keys at the recorded tick rate
+        replay = Replay.load(args.replay)
+        replay.verify = args.verify
+        world = World(seed=replay.seed, lod=replay.lod)
+        report = run(world, replay.ticks, replay.tick_dt, replay, profiler)
+        if args.verify:
+            replay.check(world)
+        args.scenario = "replay"
+        args.seed = replay.seed
+    else:
+        world = setup_world(args)
+        path = ScriptedPath(parse_path(args.path)) if args.scenario == "path" else None
+        recorder = InputRecorder(args.seed, args.dt, lod=not args.no_lod) if args.record else None
+        report = run(world, args.ticks, args.dt, path, profiler, recorder)
+    if profiler:
+        profiler.export(args.profile_out)
+    if recorder:
+        report["record_bytes"] = recorder.save(args.record)
+    if args.snapshot_out:
+        report["snapshot_bytes"] = snapshot.save(world, args.snapshot_out)
+    if replay and args.verify:
+        report["verified"] = replay.verified
+        report["mismatch_tick"] = replay.mismatch
+    report["scenario"] = args.scenario
+    report["seed"] = args.seed
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{args.scenario}: {report['state']['ticks']} ticks in {report['wall_s']}s "
+              f"({report['ticks_per_s']} ticks/s), p50 {report['p50_ms']} ms, p99 {report['p99_ms']} ms")
+        for key, value in report["state"].items():
+            print(f"  {key}: {value}")
+        pool = report["pool"]
+        print(f"  view pool: {pool['size']} views, {pool['reuse_rate']:.1%} reused, "
+              f"peak {pool['peak_frame_allocs']} allocations per tick")
+        if recorder:
+            print(f"recorded {recorder.ticks} ticks to {args.record} ({report['record_bytes']} bytes)")
+        if replay and args.verify:
+            if replay.mismatch is None:
+                print(f"replay matches the recording at all {replay.verified} checkpoints")
+            else:
+                print(f"replay diverged from the recording by tick {replay.mismatch}")
+    return report
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,316 @@
+import math
+
+import numpy as np
+
+from pool import FreeList
+from spatial import CellIndex
+
+# === ZOMBIE VIEW ===
+# Thin handle into the horde arrays. Gameplay and drawing code use it like
+# the old Zombie object; once the zombie is removed slot is -1 and hp reads 0.
+# Views are recycled, gen changes every time one is handed to a new zombie.
+class ZombieView:
+    __slots__ = ("horde", "slot", "gen")
+
+    def __init__(self, horde, slot):
+        self.horde = horde
+        self.slot = slot
+        self.gen = 0
+
+    def reset(self, horde, slot):
+        self.horde = horde
+        self.slot = slot
+        self.gen += 1
+
+    @property
+    def alive(self):
+        return self.slot >= 0
+
+    @property
+    def x(self):
+        return float(self.horde.x[self.slot])
+
+    @x.setter
+    def x(self, value):
+        self.horde.x[self.slot] = value
+        self.horde.index_dirty = True
+
+    @property
+    def y(self):
+        return float(self.horde.y[self.slot])
+
+    @y.setter
+    def y(self, value):
+        self.horde.y[self.slot] = value
+        self.horde.index_dirty = True
+
+    def render_pos(self, alpha):
+        horde, i = self.horde, self.slot
+        px, py = horde.prev_x[i], horde.prev_y[i]
+        return (float(px + (horde.x[i] - px) * alpha),
+                float(py + (horde.y[i] - py) * alpha))
+
+    @property
+    def hp(self):
+        if self.slot < 0:
+            return 0.0
+        return float(self.horde.hp[self.slot])
+
+    @property
+    def max_hp(self):
+        return float(self.horde.max_hp[self.slot])
+
+    @property
+    def speed(self):
+        return float(self.horde.speed[self.slot])
+
+    @property
+    def damage(self):
+        return float(self.horde.damage[self.slot])
+
+    @property
+    def cooldown(self):
+        return float(self.horde.cooldown[self.slot])
+
+    @property
+    def hitbox_radius(self):
+        return self.horde.hitbox_radius
+
+    def collides(self, player):
+        dist = math.hypot(self.x - player.x, self.y - player.y)
+        return dist < (self.hitbox_radius + player.radius)
+
+    def take_damage(self, dmg):
+        if self.slot >= 0:
+            self.horde.hp[self.slot] -= dmg
+
+# === HORDE ===
+# Struct-of-arrays storage for every live zombie. Slots [0, n) are alive and
+# packed; removal fills holes with survivors from the tail. version changes
+# whenever slots are added, removed or reshuffled. lod_time is the horde
+# time each zombie was last moved at, used by step_slots().
+class Horde:
+    FIELDS = ("x", "y", "prev_x", "prev_y", "speed", "hp", "max_hp", "damage", "cooldown", "lod_time")
+
+    def __init__(self, capacity=1024, hitbox_radius=25, contact_cooldown=0.5, view_cls=ZombieView, cell_size=200):
+        self.n = 0
+        self.time = 0.0
+        self.version = 0
+        self.capacity = capacity
+        self.hitbox_radius = hitbox_radius
+        self.contact_cooldown = contact_cooldown
+        self.view_pool = FreeList(view_cls)
+        self.index = CellIndex(cell_size)
+        self.index_dirty = True
+        for name in self.FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float64))
+        self.views = []
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        return iter(self.views)
+
+    def __bool__(self):
+        return self.n > 0
+
+    def begin_frame(self):
+        self.view_pool.begin_frame()
+
+    def stats(self):
+        stats = self.view_pool.stats()
+        stats["active"] = self.n
+        stats["capacity"] = self.capacity
+        return stats
+
+    def _grow(self):
+        self.capacity *= 2
+        for name in self.FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(self.capacity, dtype=old.dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+
+    def spawn(self, x, y, speed=250, hp=50, damage=10):
+        if self.n == self.capacity:
+            self._grow()
+        i = self.n
+        self.x[i] = x
+        self.y[i] = y
+        self.prev_x[i] = x
+        self.prev_y[i] = y
+        self.speed[i] = speed
+        self.hp[i] = hp
+        self.max_hp[i] = hp
+        self.damage[i] = damage
+        self.cooldown[i] = 0.0
+        self.lod_time[i] = self.time
+        self.n += 1
+        self.version += 1
+        view = self.view_pool.acquire(self, i)
+        self.views.append(view)
+        self.index_dirty = True
+        return view
+
+    def restore(self, n, columns):
+        # Replace every zombie at once, columns maps each FIELD to n values.
+        # Views already handed out are reissued (new gen) for the new slots.
+        if n > self.capacity:
+            while self.capacity < n:
+                self.capacity *= 2
+            for name in self.FIELDS:
+                setattr(self, name, np.zeros(self.capacity, dtype=np.float64))
+        for name in self.FIELDS:
+            getattr(self, name)[:n] = columns[name]
+        views = self.views
+        for view in views[n:]:
+            view.slot = -1
+            self.view_pool.release(view)
+        del views[n:]
+        for i, view in enumerate(views):
+            view.reset(self, i)
+        acquire = self.view_pool.acquire
+        views.extend([acquire(self, i) for i in range(len(views), n)])
+        self.n = n
+        self.version += 1
+        self.index_dirty = True
+
+    def store_previous(self):
+        n = self.n
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def step(self, dt, player, flow=None):
+        # Seek the player (or follow the flow field), tick cooldowns and
+        # resolve contact for every zombie at once. Returns the total
+        # contact damage dealt this step.
+        self.time += dt
+        n = self.n
+        if n == 0:
+            return 0
+        x, y = self.x[:n], self.y[:n]
+        cooldown = self.cooldown[:n]
+        self.lod_time[:n] = self.time  # everybody is current, a LOD world can take over from here
+
+        if flow is not None:
+            ux, uy = flow.steer(x, y, player.x, player.y)
+            step = self.speed[:n] * dt
+            x += ux * step
+            y += uy * step
+        else:
+            dx = player.x - x
+            dy = player.y - y
+            dist = np.hypot(dx, dy)
+            scale = np.where(dist > 0.001, self.speed[:n] * dt / np.maximum(dist, 0.001), 0.0)
+            x += dx * scale
+            y += dy * scale
+        np.subtract(cooldown, dt, out=cooldown, where=cooldown > 0)
+
+        self.index_dirty = True
+
+        reach = self.hitbox_radius + player.radius
+        hit = (np.hypot(x - player.x, y - player.y) < reach) & (cooldown <= 0)
+        if not hit.any():
+            return 0
+        cooldown[hit] = self.contact_cooldown
+        return float(self.damage[:n][hit].sum())
+
+    def step_slots(self, slots, player, flow=None, contact=True):
+        # step() for some slots only (see lod.py). Each zombie moves by the
+        # time since its own last move rather than by one fixed dt, but no
+        # further than the player, like LodScheduler.catch_up(). slots may
+        # also be a slice.
+        elapsed = self.time - self.lod_time[slots]
+        if elapsed.size == 0:
+            return 0
+        self.lod_time[slots] = self.time
+        x, y = self.x[slots], self.y[slots]
+        dx = player.x - x
+        dy = player.y - y
+        dist = np.hypot(dx, dy)
+        if flow is not None:
+            ux, uy = flow.steer(x, y, player.x, player.y)
+        else:
+            inv = np.where(dist > 0.001, 1.0 / np.maximum(dist, 0.001), 0.0)
+            ux, uy = dx * inv, dy * inv
+        step = np.minimum(self.speed[slots] * elapsed, dist)
+        x += ux * step
+        y += uy * step
+        self.x[slots] = x
+        self.y[slots] = y
+        cooldown = self.cooldown[slots]
+        cooldown = np.where(cooldown > 0, cooldown - elapsed, cooldown)
+        self.index_dirty = True
+
+        damage = 0
+        if contact:
+            reach = self.hitbox_radius + player.radius
+            hit = (np.hypot(x - player.x, y - player.y) < reach) & (cooldown <= 0)
+            if hit.any():
+                cooldown[hit] = self.contact_cooldown
+                damage = float(self.damage[slots][hit].sum())
+        self.cooldown[slots] = cooldown
+        return damage
+
+    # === QUERIES ===
+    # The cell index is rebuilt lazily, at most once per step and only when
+    # something actually asks for neighbours.
+    def _index(self):
+        if self.index_dirty:
+            self.index.build(self.x[:self.n], self.y[:self.n])
+            self.index_dirty = False
+        return self.index
+
+    def query_radius(self, x, y, radius):
+        views = self.views
+        return [views[i] for i in self._index().query_radius(x, y, radius).tolist()]
+
+    def nearest(self, x, y, k=1):
+        views = self.views
+        return [views[i] for i in self._index().nearest(x, y, k).tolist()]
+
+    def visible(self, left, top, right, bottom, alpha=1.0):
+        # Slots whose interpolated position lies inside the given rectangle
+        n = self.n
+        px, py = self.prev_x[:n], self.prev_y[:n]
+        x = px + (self.x[:n] - px) * alpha
+        y = py + (self.y[:n] - py) * alpha
+        return np.flatnonzero((x >= left) & (x <= right) & (y >= top) & (y <= bottom))
+
+    def render_positions(self, slots, alpha=1.0):
+        px, py = self.prev_x[slots], self.prev_y[slots]
+        return px + (self.x[slots] - px) * alpha, py + (self.y[slots] - py) * alpha
+
+    def dead_mask(self):
+        return self.hp[:self.n] <= 0
+
+    def remove_dead(self):
+        # Returns the views that were removed this call.
+        n = self.n
+        dead = np.flatnonzero(self.hp[:n] <= 0)
+        if len(dead) == 0:
+            return []
+        m = n - len(dead)
+        holes = dead[dead < m]
+        alive_tail = np.arange(m, n)
+        alive_tail = alive_tail[self.hp[m:n] > 0]
+
+        removed = [self.views[i] for i in dead]
+        for name in self.FIELDS:
+            arr = getattr(self, name)
+            arr[holes] = arr[alive_tail]
+        for hole, src in zip(holes.tolist(), alive_tail.tolist()):
+            view = self.views[src]
+            view.slot = hole
+            self.views[hole] = view
+        del self.views[m:]
+        self.n = m
+        self.version += 1
+
+        self.index_dirty = True
+
+        for view in removed:
+            view.slot = -1
+            self.view_pool.release(view)
+        return removed
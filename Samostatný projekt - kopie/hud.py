@@ -0,0 +1,159 @@
+import numpy as np
+import pygame
+
+# === HUD ===
+# Text, XP bar and minimap kept on persistent surfaces. Each one is only
+# re-rendered when the value it shows changes; renders counts those and
+# dirty lists the screen areas that changed in the last draw().
+class Hud:
+    def __init__(self, font, screen_w, screen_h, minimap_interval=0.25, heat_bins=50):
+        self.font = font
+        self.text_color = (255,255,255)
+
+        self.minimap_size = 200
+        self.minimap_margin = 200
+        self.minimap_pos = (screen_w - self.minimap_size - self.minimap_margin, self.minimap_margin)
+        self.minimap_surface = pygame.Surface((self.minimap_size, self.minimap_size), pygame.SRCALPHA)
+        self.minimap_dot = None
+
+        # Zombie density, binned on a heat_bins x heat_bins grid and rebuilt
+        # every minimap_interval seconds of game time
+        self.minimap_interval = minimap_interval
+        self.heat_bins = heat_bins
+        self.heat_small = pygame.Surface((heat_bins, heat_bins))
+        self.heat_surface = pygame.Surface((self.minimap_size, self.minimap_size))
+        self.heat_surface.set_colorkey((0,0,0))
+        self.heat_surface.set_alpha(200)
+        self.heat_time = None
+
+        self.xp_bar_width = 10
+        self.xp_bar_margin = 200
+        self.xp_bar_height = screen_h - 2 * self.xp_bar_margin
+        self.xp_bar_pos = (self.xp_bar_margin, self.xp_bar_margin)
+        self.xp_surface = pygame.Surface((self.xp_bar_width, self.xp_bar_height), pygame.SRCALPHA)
+        self.xp_fill = None
+
+        text_x = self.xp_bar_margin + self.xp_bar_width + 10
+        text_y = self.xp_bar_margin
+        self.text_pos = {
+            "level": (text_x, text_y),
+            "hp": (text_x, text_y + 22),
+            "kills": (text_x, text_y + 44),
+        }
+        self.texts = {}  # name -> (string, rendered surface)
+
+        self.renders = 0
+        self.blit_rects = {}
+        self.dirty = []
+
+    def text(self, name, string):
+        cached = self.texts.get(name)
+        if cached is None or cached[0] != string:
+            cached = (string, self.font.render(string, True, self.text_color))
+            self.texts[name] = cached
+            self.renders += 1
+        return cached[1]
+
+    def xp_bar(self, player):
+        fill_h = int(self.xp_bar_height * (player.xp / player.xp_to_next))
+        if fill_h != self.xp_fill:
+            self.xp_surface.fill((0,0,0,120))
+            pygame.draw.rect(self.xp_surface, (80,255,80), (0, self.xp_bar_height - fill_h, self.xp_bar_width, fill_h))
+            self.xp_fill = fill_h
+            self.renders += 1
+        return self.xp_surface
+
+    def heat_map(self, level, enemies):
+        bins = self.heat_bins
+        n = enemies.n
+        bx = np.clip((enemies.x[:n] * (bins / level.width)).astype(np.int64), 0, bins - 1)
+        by = np.clip((enemies.y[:n] * (bins / level.height)).astype(np.int64), 0, bins - 1)
+        counts = np.bincount(bx * bins + by, minlength=bins * bins).reshape(bins, bins)
+
+        # log scale so a few stragglers still show next to a big pack
+        heat = np.log1p(counts) / np.log1p(max(int(counts.max()), 1))
+        rgb = np.zeros((bins, bins, 3), dtype=np.uint8)
+        occupied = counts > 0
+        rgb[..., 0] = np.where(occupied, 40 + 160 * heat, 0)
+        rgb[..., 1] = np.where(occupied, 110 + 145 * heat, 0)
+        rgb[..., 2] = np.where(occupied, 40 * (1 - heat), 0)
+        pygame.surfarray.blit_array(self.heat_small, rgb)
+        pygame.transform.scale(self.heat_small, (self.minimap_size, self.minimap_size), self.heat_surface)
+
+    def minimap(self, world):
+        level, player = world.level, world.player
+        size = self.minimap_size
+        dot = (int(player.x * size / level.width), int(player.y * size / level.height))
+        refresh = self.heat_time is None or world.time - self.heat_time >= self.minimap_interval
+        if refresh:
+            self.heat_map(level, world.enemies)
+            self.heat_time = world.time
+        if refresh or dot != self.minimap_dot:
+            self.minimap_surface.fill((255,255,0,50))
+            self.minimap_surface.blit(self.heat_surface, (0, 0))
+            pygame.draw.circle(self.minimap_surface, (255,0,0), dot, 4)
+            self.minimap_dot = dot
+            self.renders += 1
+        return self.minimap_surface
+
+    def reset(self):
+        # New world: its clock starts over, so refresh the heat map right away
+        self.heat_time = None
+
+    def _blit(self, surface, name, make, pos):
+        renders = self.renders
+        image = make()
+        if self.renders != renders and hasattr(surface, "refresh"):
+            surface.refresh(image)  # texture canvas, upload the redrawn surface again
+        rect = surface.blit(image, pos)
+        if self.renders != renders:
+            old = self.blit_rects.get(name)
+            self.dirty.append(rect.union(old) if old else rect)
+        self.blit_rects[name] = rect
+
+    def draw(self, surface, world):
+        player = world.player
+        self.dirty = []
+        self._blit(surface, "minimap", lambda: self.minimap(world), self.minimap_pos)
+        self._blit(surface, "xp", lambda: self.xp_bar(player), self.xp_bar_pos)
+        self._blit(surface, "level", lambda: self.text("level", f"Level {player.level}"), self.text_pos["level"])
+        self._blit(surface, "hp", lambda: self.text("hp", f"HP: {int(player.hp)}/{player.max_hp}"), self.text_pos["hp"])
+        self._blit(surface, "kills", lambda: self.text("kills", f"Kills: {player.kills}"), self.text_pos["kills"])
+        return self.dirty
+
+# === GAME OVER PANEL ===
+# Result of the run in the middle of the screen, with its leaderboard rank
+# once the background client (leaderboard_client.py) has it. The panel is
+# only re-rendered when one of its lines changes.
+class GameOverPanel:
+    def __init__(self, title_font, font, screen_w, screen_h):
+        self.title_font = title_font
+        self.font = font
+        self.center = (screen_w // 2, screen_h // 2)
+        self.lines = None
+        self.surface = None
+
+    def render(self, lines):
+        rendered = [self.title_font.render(lines[0], True, (255,80,80))]
+        rendered += [self.font.render(line, True, (255,255,255)) for line in lines[1:]]
+        gap = 12
+        width = max(r.get_width() for r in rendered) + 80
+        height = sum(r.get_height() for r in rendered) + gap * (len(rendered) - 1) + 60
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0,0,0,190))
+        y = 30
+        for r in rendered:
+            panel.blit(r, ((width - r.get_width()) // 2, y))
+            y += r.get_height() + gap
+        return panel
+
+    def draw(self, surface, player, survival, status):
+        minutes, seconds = divmod(int(survival), 60)
+        lines = ["GAME OVER",
+                 f"Kills {player.kills}    Level {player.level}    Survived {minutes}:{seconds:02d}",
+                 status,
+                 "R - play again    Esc - quit"]
+        if lines != self.lines:
+            self.surface = self.render(lines)
+            self.lines = lines
+        return surface.blit(self.surface, self.surface.get_rect(center=self.center))
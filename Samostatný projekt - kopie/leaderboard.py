@@ -0,0 +1,228 @@
+import argparse
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# === LEADERBOARD STORE ===
+# One row per finished run in SQLite. Runs are ranked by kills, then by
+# survival time, then by who got there first; the rank index covers
+# exactly that order, so a page of the top list is an index walk and the
+# rank of a score is two index range counts. run_id is unique, so a
+# client retrying a batch whose reply it never saw can't add a run twice.
+HERE = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(HERE, "leaderboard.sqlite3")
+PLAYER_MAX = 32
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL UNIQUE,
+    player TEXT NOT NULL,
+    kills INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    survival REAL NOT NULL,
+    seed INTEGER,
+    created REAL NOT NULL DEFAULT (julianday('now'))
+);
+CREATE INDEX IF NOT EXISTS runs_rank ON runs (kills DESC, survival DESC, id);
+"""
+
+class LeaderboardStore:
+    def __init__(self, path=DB_PATH):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.lock = threading.Lock()  # one connection shared by the server threads
+        self.version = 0  # bumped whenever runs are added, keys the page cache
+        self.started = int(time.time())  # versions restart with the server, ETags must not repeat
+
+    def count(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def add_runs(self, runs):
+        # Insert a batch of validated runs in one transaction. Returns
+        # {run_id: rank}, including runs that were already stored.
+        with self.lock, self.db:
+            changes = self.db.total_changes
+            self.db.executemany(
+                "INSERT OR IGNORE INTO runs (run_id, player, kills, level, survival, seed) "
+                "VALUES (:run_id, :player, :kills, :level, :survival, :seed)", runs)
+            if self.db.total_changes != changes:
+                self.version += 1
+            return {run["run_id"]: self._rank(run["kills"], run["survival"]) for run in runs}
+
+    def rank(self, kills, survival):
+        with self.lock:
+            return self._rank(kills, survival)
+
+    def _rank(self, kills, survival):
+        # 1 + runs strictly ahead; a tie on both shares the better rank
+        ahead = self.db.execute("SELECT COUNT(*) FROM runs WHERE kills > ?", (kills,)).fetchone()[0]
+        ahead += self.db.execute("SELECT COUNT(*) FROM runs WHERE kills = ? AND survival > ?",
+                                 (kills, survival)).fetchone()[0]
+        return ahead + 1
+
+    def page(self, page, per_page):
+        with self.lock:
+            total = self.db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+            rows = self.db.execute(
+                "SELECT player, kills, level, survival FROM runs "
+                "ORDER BY kills DESC, survival DESC, id LIMIT ? OFFSET ?",
+                (per_page, (page - 1) * per_page)).fetchall()
+        first = (page - 1) * per_page + 1
+        return {
+            "page": page,
+            "per_page": per_page,
+            "pages": max(1, math.ceil(total / per_page)),
+            "total": total,
+            "entries": [dict(row, rank=first + i) for i, row in enumerate(rows)],
+        }
+
+    def close(self):
+        self.db.close()
+
+def validate_run(item):
+    # A run as the game client sends it, or ValueError
+    if not isinstance(item, dict):
+        raise ValueError("each run must be an object")
+    try:
+        run = {
+            "run_id": str(item["run_id"])[:64],
+            "player": str(item.get("player") or "player").strip()[:PLAYER_MAX] or "player",
+            "kills": int(item["kills"]),
+            "level": int(item["level"]),
+            "survival": float(item["survival"]),
+            "seed": int(item["seed"]) if item.get("seed") is not None else None,
+        }
+    except (KeyError, TypeError, ValueError) as err:
+        raise ValueError(f"bad run: {err}") from None
+    if not run["run_id"] or run["kills"] < 0 or run["level"] < 1 or not 0 <= run["survival"] < 1e7:
+        raise ValueError("bad run: out of range values")
+    return run
+
+# === HTTP API ===
+#   POST /api/runs         {"runs": [run, ...]}  -> {"ranks": {run_id: rank}}
+#   GET  /api/leaderboard  ?page=1&per_page=20   -> one page of the top list
+#   GET  /api/rank         ?kills=..&survival=.. -> {"rank": r, "total": n}
+#   GET  /                 web.html (and web.css), which reads the API
+# Leaderboard pages are cached in memory until the next write and carry
+# an ETag, so a browser polling an unchanged board gets 304s.
+STATIC = {"/": ("web.html", "text/html; charset=utf-8"),
+          "/web.html": ("web.html", "text/html; charset=utf-8"),
+          "/web.css": ("web.css", "text/css; charset=utf-8")}
+MAX_BATCH = 500
+MAX_PER_PAGE = 100
+PAGE_MAX_AGE = 5  # seconds browsers may reuse a page without asking
+
+class LeaderboardHandler(BaseHTTPRequestHandler):
+    store = None  # set by serve()
+    cache = {}  # (page, per_page) -> (version, body)
+    quiet = False
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def send_json(self, status, payload, headers=()):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        try:
+            if url.path == "/api/leaderboard":
+                page = max(1, int(query.get("page", ["1"])[0]))
+                per_page = min(MAX_PER_PAGE, max(1, int(query.get("per_page", ["20"])[0])))
+                return self.leaderboard_page(page, per_page)
+            if url.path == "/api/rank":
+                kills = int(query["kills"][0])
+                survival = float(query.get("survival", ["0"])[0])
+                return self.send_json(200, {"rank": self.store.rank(kills, survival), "total": self.store.count()})
+        except (KeyError, ValueError):
+            return self.send_json(400, {"error": "bad query"})
+        if url.path in STATIC:
+            return self.send_static(*STATIC[url.path])
+        self.send_json(404, {"error": "not found"})
+
+    def leaderboard_page(self, page, per_page):
+        version = self.store.version
+        etag = f'"{self.store.started}-{version}-{page}-{per_page}"'
+        headers = (("ETag", etag), ("Cache-Control", f"max-age={PAGE_MAX_AGE}"))
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        cached = self.cache.get((page, per_page))
+        if cached is None or cached[0] != version:
+            if cached is not None or len(self.cache) > 256:
+                self.cache.clear()  # something was written, every page may have moved
+            body = json.dumps(self.store.page(page, per_page)).encode()
+            cached = self.cache[(page, per_page)] = (version, body)
+        self.send_json(200, cached[1], headers)
+
+    def send_static(self, name, content_type):
+        try:
+            with open(os.path.join(HERE, name), "rb") as f:
+                body = f.read()
+        except OSError:
+            return self.send_json(404, {"error": "not found"})
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/api/runs":
+            return self.send_json(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length))
+            items = payload["runs"]
+            if not isinstance(items, list) or not 0 < len(items) <= MAX_BATCH:
+                raise ValueError(f"runs must be a list of 1 to {MAX_BATCH} runs")
+            runs = [validate_run(item) for item in items]
+        except (KeyError, TypeError, ValueError) as err:
+            return self.send_json(400, {"error": str(err)})
+        self.send_json(200, {"ranks": self.store.add_runs(runs)})
+
+def serve(host="127.0.0.1", port=8765, db=DB_PATH, quiet=False):
+    # Returns the server; call serve_forever() on it (or on a thread)
+    handler = type("Handler", (LeaderboardHandler,), {"store": LeaderboardStore(db), "cache": {}, "quiet": quiet})
+    return ThreadingHTTPServer((host, port), handler)
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", default=DB_PATH, help="SQLite file, created on first start")
+    parser.add_argument("--quiet", action="store_true", help="don't log every request")
+    args = parser.parse_args(argv)
+    server = serve(args.host, args.port, args.db, args.quiet)
+    print(f"leaderboard on http://{args.host}:{server.server_address[1]}/ ({args.db})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.RequestHandlerClass.store.close()
+
+if __name__ == "__main__":
+    cli()
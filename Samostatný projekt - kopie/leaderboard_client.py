@@ -0,0 +1,134 @@
+import json
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+# === LEADERBOARD CLIENT ===
+# Sends finished runs to the leaderboard service (leaderboard.py) without
+# ever making the frame loop wait: submit() only puts the run on a queue.
+# A background thread collects runs into batches of up to batch_size,
+# waiting at most flush_interval for more, and POSTs each batch. A failed
+# POST is retried with exponential backoff, up to `retries` times per
+# batch; after that the batch stays pending for the next round. Every run
+# carries its own run_id, so a retry the server already stored is ignored
+# there rather than counted twice. A batch the server rejects (4xx) is
+# dropped, sending it again wouldn't help.
+#
+# ranks collects {run_id: rank} from the server's replies; reading it
+# from the game thread is safe. close() flushes what is left, waiting
+# at most `timeout` seconds.
+DEFAULT_URL = "http://127.0.0.1:8765"
+
+class LeaderboardClient:
+    def __init__(self, url=DEFAULT_URL, batch_size=20, flush_interval=2.0, retries=4, backoff=0.5,
+                 timeout=2.0, max_pending=1000):
+        self.url = url.rstrip("/") + "/api/runs"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.queue = queue.Queue()
+        self.pending = []  # runs taken off the queue, not yet stored
+        self.max_pending = max_pending
+        self.ranks = {}
+        self.stats = {"submitted": 0, "sent": 0, "batches": 0, "failures": 0, "dropped": 0}
+        self.closing = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="leaderboard", daemon=True)
+        self.thread.start()
+
+    def submit(self, player, kills, level, survival, seed=None):
+        # Returns the run_id to look the rank up by
+        run = {"run_id": uuid.uuid4().hex, "player": player, "kills": kills, "level": level,
+               "survival": round(survival, 3), "seed": seed}
+        self.queue.put(run)
+        self.stats["submitted"] += 1
+        return run["run_id"]
+
+    def rank(self, run_id):
+        return self.ranks.get(run_id)
+
+    def status(self, run_id):
+        # One line for the game over screen
+        rank = self.ranks.get(run_id)
+        if rank is not None:
+            return f"Leaderboard rank #{rank}"
+        if self.stats["failures"]:
+            return "Leaderboard unreachable, retrying in the background"
+        return "Submitting score..."
+
+    def run(self):
+        while True:
+            self.collect()
+            if self.pending:
+                self.flush()
+            elif self.closing.is_set():
+                return
+
+    def collect(self):
+        # Move runs from the queue to pending until a batch is full, the
+        # oldest waiting run is flush_interval old or close() was called
+        deadline = time.monotonic() + self.flush_interval if self.pending else None
+        while len(self.pending) < self.batch_size:
+            if self.closing.is_set():
+                try:
+                    self.pending.append(self.queue.get_nowait())  # take what is left, stop waiting
+                    continue
+                except queue.Empty:
+                    return
+            wait = 0.25 if deadline is None else deadline - time.monotonic()
+            if wait <= 0:
+                return
+            try:
+                run = self.queue.get(timeout=wait)
+            except queue.Empty:
+                if deadline is None:
+                    continue  # idle, check for close() again
+                return
+            self.pending.append(run)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+
+    def flush(self):
+        batch = self.pending[:self.batch_size]
+        for attempt in range(self.retries + 1):
+            try:
+                ranks = self.post(batch)
+            except (OSError, ValueError, KeyError) as err:  # URLError, HTTPError and timeouts are OSErrors
+                self.stats["failures"] += 1
+                if isinstance(err, urllib.error.HTTPError) and 400 <= err.code < 500:
+                    del self.pending[:len(batch)]
+                    self.stats["dropped"] += len(batch)
+                    return False
+                if attempt == self.retries:
+                    break
+                if self.closing.wait(self.backoff * 2 ** attempt) and attempt:
+                    break  # shutting down: one quick retry, then give up on it
+                continue
+            self.ranks.update(ranks)
+            del self.pending[:len(batch)]
+            self.stats["sent"] += len(batch)
+            self.stats["batches"] += 1
+            return True
+        if self.closing.is_set():
+            self.stats["dropped"] += len(self.pending)
+            self.pending.clear()
+        elif len(self.pending) > self.max_pending:
+            dropped = len(self.pending) - self.max_pending
+            del self.pending[:dropped]  # service gone for good, keep the newest runs
+            self.stats["dropped"] += dropped
+        return False
+
+    def post(self, runs):
+        body = json.dumps({"runs": runs}).encode()
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())["ranks"]
+
+    def close(self, timeout=3.0):
+        self.closing.set()
+        self.thread.join(timeout)
+        return not self.thread.is_alive()
@@ -0,0 +1,119 @@
+import numpy as np
+
+# === SIMULATION LOD ===
+# Splits the horde into regions by distance from the camera view:
+#   near - inside the view or within near_margin px of it: stepped every
+#          tick, the only zombies that can touch the player
+#   mid  - within mid_margin px: one of mid_every staggered groups is
+#          stepped per tick, so each zombie moves every mid_every ticks
+#   far  - everything else: untouched per tick; at each regroup they walk
+#          straight at the player, ignoring the flow field
+# Every zombie is advanced by the game time since its own last update
+# (Horde.lod_time), so a zombie that changes region neither skips nor
+# repeats any time. Regions are rebuilt every regroup_interval seconds of
+# game time (regroup_every ticks at the current dt) and whenever zombies
+# are added or removed; far zombies are caught up before the final split,
+# so one coming closer is promoted at its real position. Nobody can cross
+# a margin unsimulated as long as
+# (zombie speed + player speed) * regroup_interval < near_margin,
+# (250 + 400) * 0.4 = 260 px against the governor's smallest 480, whatever
+# the tick rate.
+class LodScheduler:
+    def __init__(self, near_margin=960, mid_margin=5760, mid_every=4, regroup_interval=0.4):
+        self.near_margin = near_margin
+        self.mid_margin = mid_margin
+        self.mid_every = mid_every
+        self.regroup_interval = regroup_interval
+        self.regroup_every = 1
+        self.dt = None
+        self.near = np.zeros(0, dtype=np.intp)
+        self.mid = [self.near] * mid_every
+        self.all_near = True
+        self.version = None
+        self.ticks = 0
+        self.stats = {"near": 0, "mid": 0, "far": 0, "regroups": 0}
+
+    @staticmethod
+    def outside(x, y, camera):
+        # How far each position lies outside the camera view, 0 inside
+        left, top = camera.x, camera.y
+        right, bottom = left + camera.screen_w, top + camera.screen_h
+        return np.maximum(np.maximum(left - x, x - right), np.maximum(top - y, y - bottom))
+
+    def catch_up(self, horde, slots, player):
+        # Straight line at the player for the time each zombie missed
+        if len(slots) == 0:
+            return
+        elapsed = horde.time - horde.lod_time[slots]
+        x, y = horde.x[slots], horde.y[slots]
+        dx = player.x - x
+        dy = player.y - y
+        dist = np.hypot(dx, dy)
+        scale = np.minimum(horde.speed[slots] * elapsed, dist) / np.maximum(dist, 0.001)
+        horde.x[slots] = x + dx * scale
+        horde.y[slots] = y + dy * scale
+        cooldown = horde.cooldown[slots]
+        horde.cooldown[slots] = np.where(cooldown > 0, cooldown - elapsed, cooldown)
+        horde.lod_time[slots] = horde.time
+        horde.index_dirty = True
+
+    def regroup(self, horde, camera, player):
+        n = horde.n
+        out = self.outside(horde.x[:n], horde.y[:n], camera)
+        far = np.flatnonzero(out > self.mid_margin)
+        self.catch_up(horde, far, player)
+        out[far] = self.outside(horde.x[far], horde.y[far], camera)
+
+        near = out <= self.near_margin
+        self.all_near = bool(near.all())
+        self.near = np.flatnonzero(near)
+        mid = np.flatnonzero(~near & (out <= self.mid_margin))
+        phase = mid % self.mid_every
+        self.mid = [mid[phase == k] for k in range(self.mid_every)]
+        self.version = horde.version
+        self.stats["near"] = len(self.near)
+        self.stats["mid"] = len(mid)
+        self.stats["far"] = n - len(self.near) - len(mid)
+        self.stats["regroups"] += 1
+
+    def step(self, horde, dt, player, camera, flow=None):
+        # Drop-in for Horde.step(); returns the contact damage dealt
+        horde.time += dt
+        if dt != self.dt:
+            self.dt = dt
+            self.regroup_every = max(1, round(self.regroup_interval / dt))
+        if self.version != horde.version or self.ticks % self.regroup_every == 0:
+            self.regroup(horde, camera, player)
+        group = self.mid[self.ticks % self.mid_every]
+        self.ticks += 1
+        if self.all_near:
+            # whole horde close by: contiguous slices are cheaper than gathers
+            return horde.step_slots(slice(0, horde.n), player, flow)
+        horde.step_slots(group, player, flow, contact=False)
+        return horde.step_slots(self.near, player, flow)
+
+    # Shrink or grow the simulation budget (see governor.py); the next
+    # step() regroups with the new margins. near_margin has to keep the
+    # bound above.
+    def configure(self, near_margin, mid_every):
+        self.near_margin = near_margin
+        self.mid_every = mid_every
+        self.version = None
+
+    # The current split as one code per slot (0 near, 1 mid, 2 far), so
+    # snapshot.py can restore a world that continues exactly as saved
+    def region_codes(self, horde):
+        codes = np.full(horde.n, 2, dtype=np.uint8)
+        if self.version == horde.version:
+            codes[np.concatenate(self.mid)] = 1
+            codes[self.near] = 0
+        return codes
+
+    def set_region_codes(self, horde, codes, ticks, current):
+        slots = np.arange(len(codes))
+        mid = slots[codes == 1]
+        self.near = slots[codes == 0]
+        self.all_near = len(self.near) == len(codes)
+        self.mid = [mid[mid % self.mid_every == k] for k in range(self.mid_every)]
+        self.ticks = ticks
+        self.version = horde.version if current else None
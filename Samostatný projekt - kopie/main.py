@@ -1,15 +1,31 @@
+import time
+STARTED = time.perf_counter()  # --startup-trace counts from here
+
 import pygame
+import argparse
 import random
-import math
-import sys
+import os
+import struct
+
+from assets import assets
+from horde import Horde, ZombieView
+from projectiles import Projectiles
+from particles import ParticleSystem
+from navigation import FlowField
+from lod import LodScheduler
+from render import WorldRenderer, DirtyRectPresenter, SurfaceBackend, pixel_format
+from governor import FrameGovernor
+from hud import Hud, GameOverPanel
+from profiler import FrameProfiler, ProfilerOverlay, StartupTrace, NULL_PROFILER
+from replay import InputRecorder, Replay
+import snapshot
 
-pygame.init()
 FPS = 60
+TICK_RATE = 60  # simulation steps per second, independent of FPS
+MAX_CATCHUP = 5  # most simulation steps run for one rendered frame
 
 # === SCREEN / LEVEL ===
 SCREEN_W, SCREEN_H = 1920, 1080
-screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
-pygame.display.set_caption("Camera + Enemies + XP System")
 clock = pygame.time.Clock()
 
 # === LEVEL / CAMERA ===
@@ -21,22 +37,54 @@ class Level:
         self.bg_color = (40, 40, 50)
         self.grid_color = (60, 60, 70)
         self.boundary_color = (200, 80, 80)
-
-    def draw(self, surface, camera):
-        surface.fill(self.bg_color)
-        view_rect = pygame.Rect(camera.x, camera.y, camera.screen_w, camera.screen_h)
-        start_x = (view_rect.left // self.grid_size) * self.grid_size
-        end_x = ((view_rect.right // self.grid_size) + 1) * self.grid_size
-        start_y = (view_rect.top // self.grid_size) * self.grid_size
-        end_y = ((view_rect.bottom // self.grid_size) + 1) * self.grid_size
-
-        for x in range(start_x, end_x + 1, self.grid_size):
-            pygame.draw.line(surface, self.grid_color, (x - camera.x, 0), (x - camera.x, camera.screen_h))
-        for y in range(start_y, end_y + 1, self.grid_size):
-            pygame.draw.line(surface, self.grid_color, (0, y - camera.y), (camera.screen_w, y - camera.y))
-
-        pygame.draw.rect(surface, self.boundary_color,
-                         pygame.Rect(-camera.x, -camera.y, self.width, self.height), 4)
+        self.boundary_width = 4
+        self.blocked = set()  # (cx, cy) grid cells zombies path around
+        self.nav_version = 0
+        self.bg_tile = None
+        self.bg_tile_key = None
+
+    def set_blocked(self, cell, blocked=True):
+        if blocked:
+            self.blocked.add(cell)
+        else:
+            self.blocked.discard(cell)
+        self.nav_version += 1
+
+    def background_tile(self, surface, screen_w, screen_h, g):
+        # Grid of g px cells pre-rendered one cell larger than the screen. It
+        # only changes with grid size, colours or screen size, so it is
+        # rebuilt only then.
+        key = (g, self.bg_color, self.grid_color, screen_w, screen_h, surface.get_bitsize())
+        if key != self.bg_tile_key:
+            tile_w = (screen_w // g + 2) * g
+            tile_h = (screen_h // g + 2) * g
+            tile = pygame.Surface((tile_w, tile_h), 0, pixel_format(surface))
+            tile.fill(self.bg_color)
+            for x in range(0, tile_w, g):
+                pygame.draw.line(tile, self.grid_color, (x, 0), (x, tile_h))
+            for y in range(0, tile_h, g):
+                pygame.draw.line(tile, self.grid_color, (0, y), (tile_w, y))
+            self.bg_tile = tile
+            self.bg_tile_key = key
+        return self.bg_tile
+
+    def draw(self, surface, camera, scale=1.0):
+        # scale < 1 draws into a smaller internal surface, see governor.py
+        g = max(1, round(self.grid_size * scale))
+        tile = self.background_tile(surface, surface.get_width(), surface.get_height(), g)
+        surface.blit(tile, (-(int(camera.x * scale) % g), -(int(camera.y * scale) % g)))
+
+        # The boundary is only on screen when the view reaches the level edge;
+        # four fills, which every render backend can do
+        bw = self.boundary_width
+        if (camera.x < bw or camera.y < bw or
+                camera.x + camera.screen_w > self.width - bw or
+                camera.y + camera.screen_h > self.height - bw):
+            x, y = -int(camera.x * scale), -int(camera.y * scale)
+            w, h = round(self.width * scale), round(self.height * scale)
+            b = max(1, round(bw * scale))
+            for edge in ((x, y, w, b), (x, y + h - b, w, b), (x, y, b, h), (x + w - b, y, b, h)):
+                surface.fill(self.boundary_color, edge)
 
 class Camera:
     def __init__(self, screen_w, screen_h, level_w, level_h):
@@ -55,11 +103,33 @@ class Camera:
         self.x = max(0, min(desired_x, max_x))
         self.y = max(0, min(desired_y, max_y))
 
+# === SPRITES ===
+# Atlas lookup shared by everything drawn from a sprite sheet: the class
+# names its image_path, image_size and atlas_spec. Looked up on first
+# draw, not at creation, so worlds can be built while preload() is still
+# decoding (and headless never does); scale picks the governor's smaller
+# bake.
+class Sprite:
+    __slots__ = ()
+
+    @property
+    def atlas(self):
+        return self.atlas_at(1.0)
+
+    def atlas_at(self, scale):
+        return assets.atlas(self.image_path, self.image_size, scale=scale, **self.atlas_spec)
+
 # === CHARACTER ===
-class Character:
-    def __init__(self, x, y, speed=400, image_path="character.png", image_size=(128,128)):
+class Character(Sprite):
+    image_path = "character.png"
+    image_size = (128,128)
+    atlas_spec = {"rotations": 16, "frames": 4, "mode": "mirror", "facing": 0, "max_tilt": 8}
+
+    def __init__(self, x, y, speed=400, image_path=None, image_size=None):
         self.x = float(x)
         self.y = float(y)
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.speed = speed
         self.radius = 20
         self.hp = 100
@@ -68,12 +138,14 @@ class Character:
         self.xp = 0
         self.xp_to_next = 100
         self.kills = 0  # kill count
-
-        try:
-            self.image = pygame.image.load(image_path).convert_alpha()
-            self.image = pygame.transform.scale(self.image, image_size)
-        except:
-            self.image = None
+        self.xp_growth = 1.25  # xp_to_next multiplier per level
+        self.invulnerable = False  # headless benchmarks keep the run going
+        self.heading = (1.0, 0.0)  # last direction walked, the sprite keeps facing it
+        self.walk_time = 0.0  # drives the walk animation, only runs while moving
+        if image_path:
+            self.image_path = image_path
+        if image_size:
+            self.image_size = image_size
 
     def handle_input(self, keys, dt):
         dx, dy = 0, 0
@@ -84,6 +156,9 @@ class Character:
         if dx != 0 and dy != 0:
             dx *= 0.7071
             dy *= 0.7071
+        if dx or dy:
+            self.heading = (dx, dy)
+            self.walk_time += dt
         self.x += dx * self.speed * dt
         self.y += dy * self.speed * dt
 
@@ -91,244 +166,486 @@ class Character:
         self.x = max(self.radius, min(self.x, level_w - self.radius))
         self.y = max(self.radius, min(self.y, level_h - self.radius))
 
-    def draw(self, surface, camera):
-        cx, cy = int(self.x - camera.x), int(self.y - camera.y)
-        if self.image:
-            rect = self.image.get_rect(center=(cx, cy))
-            surface.blit(self.image, rect)
-        else:
-            pygame.draw.circle(surface, (255,0,0), (cx, cy), self.radius)
+    def render_pos(self, alpha):
+        return (self.prev_x + (self.x - self.prev_x) * alpha,
+                self.prev_y + (self.y - self.prev_y) * alpha)
+
+    def draw(self, surface, camera, alpha=1.0, scale=1.0):
+        x, y = self.render_pos(alpha)
+        cx, cy = int((x - camera.x) * scale), int((y - camera.y) * scale)
+        atlas = self.atlas_at(scale)
+        if atlas:
+            moving = self.x != self.prev_x or self.y != self.prev_y
+            return atlas.draw(surface, atlas.bucket(*self.heading),
+                              atlas.frame_at(self.walk_time) if moving else 0, cx, cy)
+        return pygame.draw.circle(surface, (255,0,0), (cx, cy), max(1, round(self.radius * scale)))
 
     def gain_xp(self, amount):
         self.xp += amount
         while self.xp >= self.xp_to_next:
             self.xp -= self.xp_to_next
             self.level += 1
-            self.xp_to_next = int(self.xp_to_next * 1.25)
+            self.xp_to_next = int(self.xp_to_next * self.xp_growth)
 
     def take_damage(self, dmg):
+        if self.invulnerable:
+            return
         self.hp -= dmg
         if self.hp < 0:
             self.hp = 0
 
 # === ZOMBIE ===
-class Zombie:
-    def __init__(self, x, y, speed=250, hp=50, damage=10, image_path="zombie.png", image_size=(160,120)):
-        self.x = float(x)
-        self.y = float(y)
-        self.speed = speed
-        self.hp = hp
-        self.max_hp = hp
-        self.damage = damage
-        self.hitbox_radius = 25
-        try:
-            self.image = pygame.image.load(image_path).convert_alpha()
-            self.image = pygame.transform.scale(self.image, image_size)
-        except:
-            self.image = None
-        self.cooldown = 0.0
-
-    def update(self, dt, player):
-        dx = player.x - self.x
-        dy = player.y - self.y
-        dist = math.hypot(dx, dy)
-        if dist > 0.001:
-            nx = dx / dist
-            ny = dy / dist
-            self.x += nx * self.speed * dt
-            self.y += ny * self.speed * dt
-        if self.cooldown > 0:
-            self.cooldown -= dt
-
-    def draw(self, surface, camera):
-        cx, cy = int(self.x - camera.x), int(self.y - camera.y)
-        if self.image:
-            rect = self.image.get_rect(center=(cx, cy))
-            surface.blit(self.image, rect)
+# Zombies live in a Horde (horde.py); this is the per-zombie view used for drawing.
+# Every zombie shares one atlas, so creating a view (spawn, snapshot
+# restore) stays as cheap as a ZombieView.
+class Zombie(Sprite, ZombieView):
+    __slots__ = ()
+    image_path = "zombie.png"
+    image_size = (160,120)
+    atlas_spec = {"rotations": 16, "frames": 4, "mode": "mirror", "facing": 180}
+
+    def draw(self, surface, camera, alpha=1.0, scale=1.0):
+        x, y = self.render_pos(alpha)
+        cx, cy = int((x - camera.x) * scale), int((y - camera.y) * scale)
+        atlas = self.atlas_at(scale)
+        if atlas:
+            horde, i = self.horde, self.slot
+            rect = atlas.draw(surface, atlas.bucket(horde.x[i] - horde.prev_x[i], horde.y[i] - horde.prev_y[i]),
+                              atlas.frame_at(horde.time) + i, cx, cy)
         else:
-            pygame.draw.circle(surface, (80,200,80), (cx, cy), self.hitbox_radius)
+            rect = pygame.draw.circle(surface, (80,200,80), (cx, cy), max(1, round(self.hitbox_radius * scale)))
 
-        hp_w, hp_h = 40, 5
+        hp_w, hp_h, hp_y = round(40 * scale), max(1, round(5 * scale)), round(40 * scale)
         ratio = max(0, self.hp / self.max_hp)
-        pygame.draw.rect(surface, (0,0,0), (cx - hp_w//2, cy - 40, hp_w, hp_h))
-        pygame.draw.rect(surface, (200,50,50), (cx - hp_w//2, cy - 40, int(hp_w * ratio), hp_h))
-
-    def collides(self, player):
-        dist = math.hypot(self.x - player.x, self.y - player.y)
-        return dist < (self.hitbox_radius + player.radius)
-
-    def take_damage(self, dmg):
-        self.hp -= dmg
-
-# === FIREBALL ===
-class Fireball:
-    def __init__(self, x, y, target, damage=25, speed=350, image_path="fireball.png", image_size=(32,32)):
-        self.x = float(x)
-        self.y = float(y)
-        self.target = target
-        self.speed = speed
-        self.damage = damage
-        self.radius = 8
-        self.dead = False
-        try:
-            self.image = pygame.image.load(image_path).convert_alpha()
-            self.image = pygame.transform.scale(self.image, image_size)
-        except:
-            self.image = None
-
-    def update(self, dt):
-        if not self.target or self.target.hp <= 0:
-            self.dead = True
-            return
-        dx = self.target.x - self.x
-        dy = self.target.y - self.y
-        dist = math.hypot(dx, dy)
-        if dist > 2:
-            nx, ny = dx / dist, dy / dist
-            self.x += nx * self.speed * dt
-            self.y += ny * self.speed * dt
-        else:
-            self.target.take_damage(self.damage)
-            self.dead = True
-
-    def draw(self, surface, camera):
-        cx, cy = int(self.x - camera.x), int(self.y - camera.y)
-        if self.image:
-            rect = self.image.get_rect(center=(cx, cy))
-            surface.blit(self.image, rect)
-        else:
-            pygame.draw.circle(surface, (255,140,0), (cx, cy), self.radius)
+        bar = pygame.draw.rect(surface, (0,0,0), (cx - hp_w//2, cy - hp_y, hp_w, hp_h))
+        pygame.draw.rect(surface, (200,50,50), (cx - hp_w//2, cy - hp_y, int(hp_w * ratio), hp_h))
+        return rect.union(bar)
+
+# === FIREBALLS ===
+# Every fireball in flight lives in one Projectiles store (projectiles.py);
+# this adds the sprite and the circle fallback for drawing one of them.
+class Fireballs(Sprite, Projectiles):
+    image_path = "fireball.png"
+    image_size = (32,32)
+    atlas_spec = {"rotations": 16, "frames": 1, "mode": "rotate", "facing": 0}
+
+    def draw(self, surface, camera, i, alpha=1.0, scale=1.0):
+        px, py = self.prev_x[i], self.prev_y[i]
+        x = px + (self.x[i] - px) * alpha
+        y = py + (self.y[i] - py) * alpha
+        cx, cy = int((x - camera.x) * scale), int((y - camera.y) * scale)
+        atlas = self.atlas_at(scale)
+        if atlas:
+            return atlas.draw(surface, atlas.bucket(self.x[i] - px, self.y[i] - py), 0, cx, cy)
+        return pygame.draw.circle(surface, (255,140,0), (cx, cy), max(1, round(self.radius * scale)))
 
 # === HELPERS ===
-def spawn_outside_camera(level, camera):
-    side = random.choice(["left","right","top","bottom"])
+def spawn_outside_camera(level, camera, rng=random):
+    side = rng.choice(["left","right","top","bottom"])
     margin = 100
     if side == "left":
         x = max(0, camera.x - margin)
-        y = random.uniform(camera.y, camera.y + camera.screen_h)
+        y = rng.uniform(camera.y, camera.y + camera.screen_h)
     elif side == "right":
         x = min(level.width, camera.x + camera.screen_w + margin)
-        y = random.uniform(camera.y, camera.y + camera.screen_h)
+        y = rng.uniform(camera.y, camera.y + camera.screen_h)
     elif side == "top":
-        x = random.uniform(camera.x, camera.x + camera.screen_w)
+        x = rng.uniform(camera.x, camera.x + camera.screen_w)
         y = max(0, camera.y - margin)
     else:
-        x = random.uniform(camera.x, camera.x + camera.screen_w)
+        x = rng.uniform(camera.x, camera.x + camera.screen_w)
         y = min(level.height, camera.y + camera.screen_h + margin)
     return x, y
 
-# === DRAW MINIMAP ===
-def draw_minimap(surface, level, player, camera, pos, size):
-    map_surf = pygame.Surface((size, size), pygame.SRCALPHA)
-    map_surf.fill((255,255,0,50))
-    scale_x = size / level.width
-    scale_y = size / level.height
-    px = int(player.x * scale_x)
-    py = int(player.y * scale_y)
-    pygame.draw.circle(map_surf, (255,0,0), (px, py), 4)
-    surface.blit(map_surf, pos)
-
-# === MAIN ===
-def main():
-    level = Level(SCREEN_W * 10, SCREEN_H * 10)
-    camera = Camera(SCREEN_W, SCREEN_H, level.width, level.height)
-    player = Character(level.width/2, level.height/2)
-
-    enemies = []
-    fireballs = []
-
-    spawn_timer = 5.0
-    fire_timer = 5.0
-    fire_timer_reset = 5.0  # initial spawn delay
-
-    font = pygame.font.SysFont(None, 32)
-
-    minimap_size = 200
-    minimap_margin = 200
-    minimap_pos = (SCREEN_W - minimap_size - minimap_margin, minimap_margin)
-
-    xp_bar_width = 10
-    xp_bar_margin = 200
-    xp_bar_height = SCREEN_H - 2 * xp_bar_margin
-    xp_bar_pos = (xp_bar_margin, xp_bar_margin)
-
-    text_x = xp_bar_margin + xp_bar_width + 10
-    text_y = xp_bar_margin
-    level_text_pos = (text_x, text_y)
-    hp_text_pos = (text_x, text_y + 22)
-    kill_text_pos = (text_x, text_y + 44)
-
-    running = True
-    while running:
-        dt = clock.tick(FPS)/1000
-        for e in pygame.event.get():
-            if e.type == pygame.QUIT or (e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE):
-                running = False
+# === WORLD ===
+# All simulation state and one step() per tick. Drawing and input live in
+# main(), so the same world runs headless (see headless.py). Difficulty
+# constants can be overridden by keyword, see TUNING.
+TUNING = ("spawn_interval", "fire_interval", "fire_interval_min", "fire_decay",
+          "xp_per_kill", "xp_growth", "zombie_speed", "zombie_hp", "zombie_damage")
+
+class World:
+    TUNING = TUNING
+
+    def __init__(self, seed=None, lod=True, **tuning):
+        self.rng = random.Random(seed)
+        self.level = Level(SCREEN_W * 10, SCREEN_H * 10)
+        self.camera = Camera(SCREEN_W, SCREEN_H, self.level.width, self.level.height)
+        self.player = Character(self.level.width/2, self.level.height/2)
+
+        self.enemies = Horde(view_cls=Zombie, cell_size=self.level.grid_size)
+        self.flow = FlowField(self.level)
+        self.lod = LodScheduler() if lod else None  # see lod.py, None steps every zombie every tick
+        self.fireballs = Fireballs()
+        self.particles = None  # main() attaches a ParticleSystem, headless runs go without
+
+        self.spawn_interval = 5.0
+        self.fire_interval = 5.0
+        self.fire_interval_min = 0.5
+        self.fire_decay = 0.95
+        self.xp_per_kill = 50
+        self.xp_growth = 1.25
+        self.zombie_speed = 250
+        self.zombie_hp = 50
+        self.zombie_damage = 10
+        for name, value in tuning.items():
+            if name not in TUNING:
+                raise TypeError(f"unknown tuning parameter {name!r}")
+            setattr(self, name, value)
+        self.player.xp_growth = self.xp_growth
+
+        self.spawn_timer = self.spawn_interval
+        self.fire_timer = self.fire_interval
+        self.fire_timer_reset = self.fire_interval  # initial spawn delay
+        self.time = 0.0
+        self.ticks = 0
+        self.game_over = False
+        self.profiler = NULL_PROFILER
+
+    def spawn_zombie(self, x, y):
+        return self.enemies.spawn(x, y, self.zombie_speed, self.zombie_hp, self.zombie_damage)
+
+    def store_previous(self):
+        # Positions before this tick, rendering interpolates from these
+        self.player.prev_x, self.player.prev_y = self.player.x, self.player.y
+        self.enemies.store_previous()
+        self.fireballs.store_previous()
+
+    def step(self, dt, keys):
+        player, level, camera = self.player, self.level, self.camera
+        enemies, fireballs = self.enemies, self.fireballs
+        lap = self.profiler.lap
+        self.store_previous()
 
-        keys = pygame.key.get_pressed()
         player.handle_input(keys, dt)
         player.clamp_to_level(level.width, level.height)
         camera.update(player.x, player.y)
+        lap("input")
 
-        spawn_timer -= dt
-        if spawn_timer <= 0:
-            spawn_timer = 5.0
-            sx, sy = spawn_outside_camera(level, camera)
-            enemies.append(Zombie(sx, sy))
+        self.spawn_timer -= dt
+        if self.spawn_timer <= 0:
+            self.spawn_timer = self.spawn_interval
+            sx, sy = spawn_outside_camera(level, camera, self.rng)
+            self.spawn_zombie(sx, sy)
 
-        fire_timer -= dt
-        if fire_timer <= 0:
-            fire_timer = fire_timer_reset
+        self.fire_timer -= dt
+        if self.fire_timer <= 0:
+            self.fire_timer = self.fire_timer_reset
             if enemies:
-                target = min(enemies, key=lambda e: math.hypot(player.x - e.x, player.y - e.y))
-                fireballs.append(Fireball(player.x, player.y, target))
-
-        for z in enemies[:]:
-            z.update(dt, player)
-            if z.collides(player) and z.cooldown <= 0:
-                player.take_damage(z.damage)
-                z.cooldown = 0.5
-
-                # === GAME OVER ===
-                if player.hp <= 0:
-                    pygame.quit()
-                    sys.exit()
-
-            if z.hp <= 0:
-                enemies.remove(z)
-                player.gain_xp(50)
-
-                # === KILL COUNT & FIREBALL SPAWN SPEED ===
-                player.kills += 1
-                fire_timer_reset = max(0.5, 5.0 * (0.95 ** player.kills))  # spawn 2% faster per kill, min 0.5s
+                target = enemies.nearest(player.x, player.y)[0]
+                fireballs.spawn(player.x, player.y, target)
+        lap("spawn")
+
+        # Before the horde moves, so the hit test reuses the cell index
+        # nearest() just built; kills are collected below this same tick
+        fireballs.step(dt, enemies)
+        particles = self.particles
+        if particles is not None:
+            particles.emit(fireballs.impact_x, fireballs.impact_y, 10, "spark")
+            n = fireballs.n
+            particles.emit(fireballs.x[:n], fireballs.y[:n], 1, "trail", optional=True)
+        lap("fireball_update")
+
+        self.flow.update(player.x, player.y)
+        if self.lod:
+            contact_damage = self.lod.step(enemies, dt, player, camera, self.flow)
+        else:
+            contact_damage = enemies.step(dt, player, self.flow)
+        if contact_damage:
+            player.take_damage(contact_damage)
 
-        for f in fireballs[:]:
-            f.update(dt)
-            if f.dead:
-                fireballs.remove(f)
+            # === GAME OVER ===
+            if player.hp <= 0:
+                self.game_over = True
 
-        level.draw(screen, camera)
-        for z in enemies: z.draw(screen, camera)
-        for f in fireballs: f.draw(screen, camera)
-        player.draw(screen, camera)
+        if particles is not None:
+            dead = enemies.dead_mask()
+            particles.emit(enemies.x[:enemies.n][dead], enemies.y[:enemies.n][dead], 24, "gore")
+        for z in enemies.remove_dead():
+            player.gain_xp(self.xp_per_kill)
 
-        draw_minimap(screen, level, player, camera, minimap_pos, minimap_size)
+            # === KILL COUNT & FIREBALL SPAWN SPEED ===
+            player.kills += 1
+            self.fire_timer_reset = max(self.fire_interval_min, self.fire_interval * (self.fire_decay ** player.kills))  # spawn 2% faster per kill, min 0.5s
 
-        xp_surface = pygame.Surface((xp_bar_width, xp_bar_height), pygame.SRCALPHA)
-        xp_surface.fill((0,0,0,120))
-        fill_ratio = player.xp / player.xp_to_next
-        fill_h = int(xp_bar_height * fill_ratio)
-        pygame.draw.rect(xp_surface, (80,255,80), (0, xp_bar_height - fill_h, xp_bar_width, fill_h))
-        screen.blit(xp_surface, xp_bar_pos)
+        lap("zombie_update")
 
-        screen.blit(font.render(f"Level {player.level}", True, (255,255,255)), level_text_pos)
-        screen.blit(font.render(f"HP: {int(player.hp)}/{player.max_hp}", True, (255,255,255)), hp_text_pos)
-        screen.blit(font.render(f"Kills: {player.kills}", True, (255,255,255)), kill_text_pos)
+        self.time += dt
+        self.ticks += 1
 
-        pygame.display.flip()
+# === MAIN ===
+SPRITES = [(cls.image_path, cls.image_size, cls.atlas_spec) for cls in (Character, Zombie, Fireballs)]
+FONTS = [(None, 32), ("consolas,dejavusansmono,monospace", 18), (None, 96)]  # HUD, profiler overlay, game over
+SIM_PHASES = ["input", "spawn", "fireball_update", "zombie_update"]
+PHASES = ["wait", "events"] + SIM_PHASES + ["level_draw", "entity_draw", "hud", "present"]
+
+# Zombie view pool (horde.py) for the overlay and --profile-out
+def pool_counts(horde):
+    stats = horde.stats()
+    return {"pool": stats["size"], "pool_reuse": round(stats["reuse_rate"], 3), "pool_allocs": stats["frame_allocs"]}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tick-rate", type=float, default=TICK_RATE, help="simulation steps per second")
+    parser.add_argument("--max-catchup", type=int, default=MAX_CATCHUP, help="most steps simulated per frame")
+    parser.add_argument("--dirty-rects", action="store_true", help="update only changed screen areas when the camera is still")
+    parser.add_argument("--minimap-rate", type=float, default=4, help="zombie heat map refreshes per second")
+    parser.add_argument("--profile-out", help="write per-frame phase timings to this .csv or .json file on exit")
+    parser.add_argument("--seed", type=int, help="world seed, random by default")
+    parser.add_argument("--record", help="save seed and per-tick keys to this file on exit")
+    parser.add_argument("--replay", help="play back a recording instead of reading the keyboard")
+    parser.add_argument("--replay-speed", type=int, default=8, help="recorded ticks simulated per rendered frame")
+    parser.add_argument("--verify", action="store_true", help="check the recording's state checksums during --replay")
+    parser.add_argument("--snapshot", help="start from this world snapshot")
+    parser.add_argument("--quicksave", default="quicksave.zsnap", help="snapshot file for F5 (save) and F9 (load)")
+    parser.add_argument("--no-lod", action="store_true", help="step every zombie every tick, however far away")
+    parser.add_argument("--atlas-report", action="store_true", help="print the size of every sprite atlas once loaded")
+    parser.add_argument("--quality", type=int, choices=range(3), help="pin the governor to this level, 0 is best; adaptive by default")
+    parser.add_argument("--smooth-upscale", action="store_true", help="smoothscale the world layer at reduced quality")
+    parser.add_argument("--backend", choices=("surface", "sdl"), default="surface",
+                        help="draw with software Surface blits or through an SDL Renderer (render_sdl.py)")
+    parser.add_argument("--render-driver", help="SDL render driver for --backend sdl, e.g. software or opengl")
+    parser.add_argument("--leaderboard", default=None, help="leaderboard service URL (leaderboard.py), "
+                        "http://127.0.0.1:8765 by default")
+    parser.add_argument("--offline", action="store_true", help="don't submit finished runs to the leaderboard")
+    parser.add_argument("--player", default=os.environ.get("USER") or os.environ.get("USERNAME") or "player",
+                        help="name shown on the leaderboard")
+    parser.add_argument("--startup-trace", action="store_true", help="print time to first frame broken down by step")
+    args = parser.parse_args(argv)
+    trace = StartupTrace(STARTED)
+    trace.lap("imports")
+    if args.snapshot and (args.record or args.replay):
+        parser.error("recordings start from a fresh world, --snapshot can't be combined with --record or --replay")
+    if args.backend == "sdl" and args.dirty_rects:
+        parser.error("--dirty-rects needs the surface backend")
+    if args.backend == "sdl" and not all(os.path.exists(path) for path, _, _ in SPRITES):
+        parser.error("--backend sdl draws sprites only, the circle fallbacks need the surface backend")
+
+    # === RECORD / REPLAY ===
+    replay = recorder = None
+    tick_dt = 1 / args.tick_rate
+    seed = args.seed if args.seed is not None else random.randrange(1 << 32)
+    if args.replay:
+        replay = Replay.load(args.replay)
+        replay.verify = args.verify
+        seed, tick_dt = replay.seed, replay.tick_dt
+        args.no_lod = not replay.lod
+    elif args.record:
+        recorder = InputRecorder(seed, tick_dt, lod=not args.no_lod)
+
+    # === STARTUP ===
+    # Only the modules the game uses; no audio, joystick or camera
+    pygame.display.init()
+    pygame.font.init()
+    trace.lap("pygame init")
+    title = "Camera + Enemies + XP System"
+    if args.backend == "sdl":
+        from render_sdl import TextureBackend
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)  # pixel format for convert(), see render_sdl.py
+        try:
+            backend = TextureBackend((SCREEN_W, SCREEN_H), title, driver=args.render_driver)
+        except ValueError as err:
+            parser.error(str(err))
+    else:
+        backend = SurfaceBackend(pygame.display.set_mode((SCREEN_W, SCREEN_H)))
+        pygame.display.set_caption(title)
+    screen = backend.canvas
+    trace.lap("set_mode")
+
+    # Sprites and fonts load on a worker thread while the window shows a
+    # first frame and the world is built
+    loader = assets.preload(fonts=FONTS, atlases=SPRITES)
+    screen.fill((0,0,0))
+    backend.present()
+    trace.lap("loading frame")
+
+    governor = FrameGovernor(frame_ms=1000 / FPS, smooth=args.smooth_upscale, sim_budgets=not (recorder or replay))
+    if args.quality is not None:
+        governor.set_level(args.quality)
+
+    def new_world(seed):
+        world = World(seed=seed, lod=not args.no_lod)
+        world.particles = ParticleSystem(frame_ms=1000 / FPS)
+        governor.apply(world)
+        return world
+
+    world = new_world(seed)
+    if args.snapshot:
+        snapshot.load(world, args.snapshot)
+    level, player = world.level, world.player
+    camera = Camera(SCREEN_W, SCREEN_H, level.width, level.height)  # follows the interpolated player
+    renderer = WorldRenderer(track_rects=args.dirty_rects)
+    presenter = DirtyRectPresenter(SCREEN_W, SCREEN_H) if args.dirty_rects else None
+    accumulator = 0.0
+
+    trace.lap("world")
+
+    loader.join()
+    trace.lap("wait for assets")
+    startup_assets = (assets.preload_ms, assets.stats()["disk_hits"])  # before the next preload adds to them
+    # the governor's smaller sprites bake in the background; it waits for them
+    if args.quality != 0:
+        loader = assets.preload(atlases=governor.scaled_sprites(SPRITES))
+    if args.quality:
+        loader.join()
+    if args.atlas_report:
+        print(assets.atlas_report())
+    hud = Hud(assets.font(*FONTS[0]), SCREEN_W, SCREEN_H, minimap_interval=1 / args.minimap_rate)
+    game_over_panel = GameOverPanel(assets.font(*FONTS[2]), assets.font(*FONTS[0]), SCREEN_W, SCREEN_H)
+
+    # === LEADERBOARD ===
+    # A finished run goes to the leaderboard service through a background
+    # client (leaderboard_client.py), so a slow or missing service never
+    # holds up a frame. Created at the first game over, not at startup.
+    scores = None
+    run_id = None
+    repaint = False  # next present must push the whole screen
+
+    # === PROFILER === (F3 toggles the overlay)
+    profiler = FrameProfiler(PHASES, record=bool(args.profile_out))
+    overlay = ProfilerOverlay(assets.font(*FONTS[1]))
+    world.profiler = profiler
+    renderer.profiler = profiler
+    trace.lap("hud")
 
+    running = True
+    while running:
+        last_frame_ms = profiler.frame.get("total", 0.0) - profiler.frame.get("wait", 0.0)
+        profiler.begin_frame()
+        frame_dt = clock.tick(0 if replay else FPS)/1000
+        accumulator += frame_dt
+        world.particles.begin_frame(last_frame_ms)
+        world.enemies.begin_frame()  # view pool allocations are counted per rendered frame
+        if profiler.frames and args.quality is None and not loader.is_alive() and governor.observe(last_frame_ms):
+            governor.apply(world)
+        profiler.lap("wait")
+        fresh = None  # a new or loaded world to carry on with
+        for e in pygame.event.get():
+            if e.type in (pygame.QUIT, pygame.WINDOWCLOSE) or (e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE):
+                running = False
+            elif e.type == pygame.KEYDOWN and e.key == pygame.K_r and world.game_over:
+                if args.seed is None:
+                    seed = random.randrange(1 << 32)
+                fresh = new_world(seed)
+            elif e.type == pygame.KEYDOWN and e.key == pygame.K_F3:
+                overlay.toggle()
+            elif e.type == pygame.KEYDOWN and e.key == pygame.K_F5:
+                snapshot.save(world, args.quicksave)
+            elif e.type == pygame.KEYDOWN and e.key == pygame.K_F9 and not (recorder or replay):
+                # loaded into a fresh world, so a bad or truncated file
+                # leaves the current run as it was
+                try:
+                    fresh = snapshot.load(new_world(seed), args.quicksave)
+                except (OSError, ValueError, struct.error):
+                    pass  # nothing saved yet, or not a snapshot this version reads
+        if fresh is not None:
+            world = fresh
+            world.profiler = profiler
+            level, player = world.level, world.player
+            hud.reset()  # the heat map's clock may be ahead of the new world's
+            run_id = None  # a loaded run is a new run, its death gets submitted again
+            accumulator = 0.0
+            repaint = True
+        profiler.lap("events")
+
+        # === FIXED TIMESTEP ===
+        steps = 0
+        if replay:
+            # fast-forward: a fixed number of recorded ticks per frame, no frame cap
+            while steps < args.replay_speed and not replay.done(world):
+                world.step(tick_dt, replay.keys_for(world))
+                steps += 1
+            alpha = 1.0
+        else:
+            keys = pygame.key.get_pressed()
+            while accumulator >= tick_dt and steps < args.max_catchup and not world.game_over:
+                world.step(tick_dt, keys)
+                if recorder:
+                    recorder.record(world, keys)
+                accumulator -= tick_dt
+                steps += 1
+                if world.game_over:
+                    break
+
+        # === GAME OVER ===
+        # Recordings end with the run; otherwise the world stays on screen,
+        # frozen, under the result until the player restarts or quits
+        if replay and replay.done(world):
+            break
+        if world.game_over and (recorder or replay):
+            break
+        if world.game_over and run_id is None:
+            if scores is None and not args.offline:
+                from leaderboard_client import LeaderboardClient, DEFAULT_URL
+                scores = LeaderboardClient(args.leaderboard or DEFAULT_URL)
+            run_id = scores.submit(args.player, player.kills, player.level, world.time, seed) if scores else ""
+        if accumulator >= tick_dt:
+            accumulator %= tick_dt  # too far behind, drop the backlog instead of spiralling
+        alpha = 1.0 if replay else accumulator / tick_dt
+
+        world.particles.update(frame_dt)
+        camera.update(*player.render_pos(alpha))
+        world_surface = governor.world_surface(backend)
+        renderer.draw(world_surface, world, camera, alpha, governor.scale)
+        governor.upscale(world_surface, backend)
+        hud_renders = hud.renders
+        hud_rects = hud.draw(screen, world)
+        counts = {
+            "zombies": len(world.enemies),
+            "fireballs": len(world.fireballs),
+            "drawn": renderer.stats["drawn"],
+            "culled": renderer.stats["culled"],
+            "near": world.lod.stats["near"] if world.lod else len(world.enemies),
+            "particles": world.particles.stats["alive"],
+            "quality": governor.level,
+            "steps": steps,
+            "hud_renders": hud.renders - hud_renders,  # HUD surfaces rendered this frame
+        }
+        counts.update(pool_counts(world.enemies))
+        if world.game_over:
+            status = scores.status(run_id) if scores else "Offline, score not submitted"
+            hud_rects.append(game_over_panel.draw(screen, player, world.time, status))
+        overlay_rect = overlay.draw(screen, profiler, counts)
+        if overlay_rect:
+            hud_rects.append(overlay_rect)
+        profiler.lap("hud")
+
+        if presenter and (world_surface is not screen or repaint):
+            presenter.present_full()
+        elif presenter:
+            presenter.present(camera, renderer.rects, hud_rects)
+        else:
+            backend.present()
+        repaint = False
+        profiler.lap("present")
+        profiler.end_frame(counts)
+
+        if trace:
+            trace.lap("first frame")
+            if args.startup_trace:
+                print(trace.report())
+                preload_ms, disk_hits = startup_assets
+                print(f"asset thread {preload_ms:.1f} ms, "
+                      f"{disk_hits} of {len(SPRITES)} sprites from the disk cache")
+            trace = None
+
+    if args.profile_out:
+        profiler.export(args.profile_out)
+    if recorder:
+        size = recorder.save(args.record)
+        print(f"recorded {recorder.ticks} ticks (seed {seed}) to {args.record}, {size} bytes")
+    if replay:
+        print(f"replayed {world.ticks} of {replay.ticks} ticks, kills {player.kills}, level {player.level}")
+        if args.verify:
+            replay.check(world)
+            if replay.mismatch is None:
+                print(f"replay matches the recording at all {replay.verified} checkpoints")
+            else:
+                print(f"replay diverged from the recording by tick {replay.mismatch}")
+
+    if scores:
+        scores.close()
     pygame.quit()
-    sys.exit()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,181 @@
+import math
+
+import numpy as np
+
+# === FLOW FIELD ===
+# One shared navigation field over the level's grid cells. Rebuilt only
+# when the player enters another cell or the level's blocked cells change;
+# every zombie then just looks up its own cell.
+#
+# The distance field is one Dijkstra run from the player's cell. Every
+# step costs at least 1, so each round settles, all at once, the frontier
+# cells within 1 of the frontier's nearest; every cell is relaxed once.
+# The neighbour table it walks depends only on the blocked cells and is
+# kept until those change. Cells within los_radius of the player's cell
+# with a clear straight line to it seek the player directly (same
+# steering as before, no 8-way zigzag on open ground). The rest follow
+# the distance field around obstacles towards the cheapest neighbour.
+class FlowField:
+    DIRS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+    def __init__(self, level, cell_size=None, los_radius=8):
+        self.level = level
+        self.cell_size = cell_size or level.grid_size
+        self.cols = math.ceil(level.width / self.cell_size)
+        self.rows = math.ceil(level.height / self.cell_size)
+        shape = (self.cols, self.rows)
+        self.dist = np.zeros(shape)
+        self.flow_x = np.zeros(shape)
+        self.flow_y = np.zeros(shape)
+        self.los = np.ones(shape, dtype=bool)
+        self.los_radius = los_radius
+        self.costs = None  # step_costs() for the blocked cells of neighbours_version
+        self.neighbours = None  # (flat cell index, cost) per cell and direction, cost inf where blocked
+        self.neighbours_version = None
+        self.open = True  # no blocked cells at all
+        self.goal = None
+        self.version = None
+        self.rebuilds = 0
+
+    def cell_of(self, x, y):
+        cx = min(max(int(x // self.cell_size), 0), self.cols - 1)
+        cy = min(max(int(y // self.cell_size), 0), self.rows - 1)
+        return cx, cy
+
+    def blocked_grid(self):
+        blocked = np.zeros((self.cols, self.rows), dtype=bool)
+        for cx, cy in self.level.blocked:
+            if 0 <= cx < self.cols and 0 <= cy < self.rows:
+                blocked[cx, cy] = True
+        return blocked
+
+    def update(self, px, py):
+        goal = self.cell_of(px, py)
+        if goal == self.goal and self.level.nav_version == self.version:
+            return False
+        self.goal = goal
+        self.version = self.level.nav_version
+        self.rebuild()
+        return True
+
+    def rebuild(self):
+        self.rebuilds += 1
+        blocked = self.blocked_grid()
+        self.open = not blocked.any()
+        if self.open:
+            self.los[:] = True  # everybody walks straight at the player
+            return
+        if self.neighbours_version != self.version:
+            self.costs = self.step_costs(blocked)
+            self.neighbours = self.neighbour_table()
+            self.neighbours_version = self.version
+        self.dist = self.distance_field()
+        self.flow_x, self.flow_y = self.directions()
+        self.los = self.line_of_sight(blocked) | ~np.isfinite(self.dist)
+
+    @staticmethod
+    def windows(shape, dx, dy):
+        # (dst, src) index windows so that dst cell c lines up with src cell c + (dx, dy)
+        cols, rows = shape
+        xs, xd = (slice(dx, None), slice(0, cols - dx)) if dx >= 0 else (slice(0, cols + dx), slice(-dx, None))
+        ys, yd = (slice(dy, None), slice(0, rows - dy)) if dy >= 0 else (slice(0, rows + dy), slice(-dy, None))
+        return (xd, yd), (xs, ys)
+
+    @classmethod
+    def shifted(cls, a, dx, dy, fill):
+        # out[c] = a[c + (dx, dy)], cells past the edge get fill
+        out = np.full_like(a, fill)
+        dst, src = cls.windows(a.shape, dx, dy)
+        out[dst] = a[src]
+        return out
+
+    def step_costs(self, blocked):
+        # Cost of moving from each cell to its neighbour in every direction;
+        # diagonals can't cut the corner of a blocked cell.
+        open_ = ~blocked
+        costs = []
+        for dx, dy in self.DIRS:
+            ok = open_ & self.shifted(open_, dx, dy, False)
+            if dx and dy:
+                ok &= self.shifted(open_, dx, 0, False) & self.shifted(open_, 0, dy, False)
+            costs.append(np.where(ok, math.hypot(dx, dy), np.inf))
+        return costs
+
+    def neighbour_table(self):
+        cx, cy = np.meshgrid(np.arange(self.cols), np.arange(self.rows), indexing="ij")
+        index = np.empty((self.cols * self.rows, len(self.DIRS)), dtype=np.intp)
+        cost = np.empty(index.shape)
+        for d, ((dx, dy), step) in enumerate(zip(self.DIRS, self.costs)):
+            nx = np.clip(cx + dx, 0, self.cols - 1)
+            ny = np.clip(cy + dy, 0, self.rows - 1)
+            index[:, d] = (nx * self.rows + ny).ravel()
+            cost[:, d] = step.ravel()  # inf past the edge, so the clipped index is never used
+        return index, cost
+
+    def distance_field(self):
+        # Dijkstra from the goal cell; moves cost the same both ways, so the
+        # distance from the goal is also the distance to it
+        index, cost = self.neighbours
+        dist = np.full(len(index), np.inf)
+        waiting = np.zeros(len(index), dtype=bool)  # reached, not settled yet
+        start = self.goal[0] * self.rows + self.goal[1]
+        dist[start] = 0.0
+        waiting[start] = True
+        frontier = np.array([start])
+        while len(frontier):
+            d = dist[frontier]
+            settle = frontier[d < d.min() + 1.0]  # nothing left can reach these cheaper
+            waiting[settle] = False
+            reach = dist[settle, None] + cost[settle]
+            cells = index[settle]
+            better = reach < dist[cells]
+            cells = cells[better]
+            np.minimum.at(dist, cells, reach[better])
+            waiting[cells] = True
+            frontier = np.flatnonzero(waiting)
+        return dist.reshape(self.cols, self.rows)
+
+    def directions(self):
+        totals = np.stack([self.shifted(self.dist, dx, dy, np.inf) + cost
+                           for (dx, dy), cost in zip(self.DIRS, self.costs)])
+        best = np.argmin(totals, axis=0)
+        unit = np.array([(dx / math.hypot(dx, dy), dy / math.hypot(dx, dy)) for dx, dy in self.DIRS])
+        flow_x = unit[best, 0]
+        flow_y = unit[best, 1]
+        stuck = ~np.isfinite(totals.min(axis=0))
+        flow_x[stuck] = 0.0
+        flow_y[stuck] = 0.0
+        return flow_x, flow_y
+
+    def line_of_sight(self, blocked):
+        # Walk half-cell steps from every cell centre within los_radius to
+        # the goal centre; cells further out follow the field
+        gx, gy = self.goal
+        r = self.los_radius
+        x0, x1 = max(gx - r, 0), min(gx + r + 1, self.cols)
+        y0, y1 = max(gy - r, 0), min(gy + r + 1, self.rows)
+        cx, cy = np.meshgrid(np.arange(x0, x1), np.arange(y0, y1), indexing="ij")
+        start_x, start_y = cx + 0.5, cy + 0.5
+        span_x, span_y = gx - cx, gy - cy
+        hit = np.zeros(cx.shape, dtype=bool)
+        for t in np.linspace(0.0, 1.0, 2 * r + 1):
+            hit |= blocked[(start_x + span_x * t).astype(np.intp), (start_y + span_y * t).astype(np.intp)]
+        los = np.zeros_like(blocked)
+        los[x0:x1, y0:y1] = ~hit
+        return los
+
+    def steer(self, x, y, px, py):
+        # Unit direction for every position in x/y, zero when on the player
+        dx = px - x
+        dy = py - y
+        dist = np.hypot(dx, dy)
+        inv = np.where(dist > 0.001, 1.0 / np.maximum(dist, 0.001), 0.0)
+        if self.open:
+            return dx * inv, dy * inv
+        cs = self.cell_size
+        cx = np.clip((x // cs).astype(np.int64), 0, self.cols - 1)
+        cy = np.clip((y // cs).astype(np.int64), 0, self.rows - 1)
+        direct = self.los[cx, cy]
+        ux = np.where(direct, dx * inv, self.flow_x[cx, cy])
+        uy = np.where(direct, dy * inv, self.flow_y[cx, cy])
+        return ux, uy
@@ -0,0 +1,143 @@
+import math
+
+import numpy as np
+import pygame
+
+from render import pixel_format
+
+# === PARTICLES ===
+# Fixed-capacity ring buffer of purely visual particles: position,
+# velocity, age and lifetime columns plus a style per slot. emit() writes
+# a whole burst at the head and overwrites the oldest particles once the
+# ring is full; a slot is dead when age >= life. update() moves every
+# slot at once and draws nothing, batch() turns the live ones in view
+# into (surface, pos) pairs for one Surface.blits() call.
+#
+# Particles never touch the world's rng, so recordings and snapshots are
+# unaffected by them.
+#
+# Budget: at most `budget` particles are emitted per rendered frame.
+# Optional emissions (trails) never take the last quarter of it, which is
+# kept for bursts. begin_frame() is told how long the last frame took;
+# while that is over frame_ms, optional emissions are dropped and bursts
+# share that quarter. Everything dropped is counted in stats.
+STYLES = {
+    # name: (colour, radius px, speed range, lifetime range, drag per second)
+    "trail": ((255,140,40), 5, (10, 40), (0.2, 0.35), 4.0),
+    "spark": ((255,220,120), 4, (80, 260), (0.15, 0.3), 6.0),
+    "gore": ((90,170,60), 6, (40, 200), (0.35, 0.7), 5.0),
+}
+
+class ParticleSystem:
+    FIELDS = ("x", "y", "vx", "vy", "age", "life")
+
+    def __init__(self, capacity=4096, budget=600, frame_ms=1000 / 60, fade_steps=8, seed=None):
+        self.capacity = capacity
+        self.budget = budget
+        self.frame_ms = frame_ms
+        self.fade_steps = fade_steps
+        for name in self.FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float64))
+        self.style = np.zeros(capacity, dtype=np.int64)
+        self.head = 0
+        self.rng = np.random.default_rng(seed)
+        self.names = list(STYLES)
+        self.drag = np.array([STYLES[name][4] for name in self.names])
+        self.allowance = budget
+        self.over_budget = False
+        self.surfaces = {}  # render scale -> dots
+        self.stats = {"alive": 0, "emitted": 0, "dropped": 0}
+
+    def begin_frame(self, last_frame_ms=0.0):
+        self.over_budget = last_frame_ms > self.frame_ms
+        self.allowance = self.budget // 4 if self.over_budget else self.budget
+
+    def emit(self, x, y, count, style, vx=0.0, vy=0.0, optional=False):
+        # count particles per position in x, y (scalars or arrays), flying
+        # off in random directions on top of the base velocity vx, vy
+        x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+        y = np.atleast_1d(np.asarray(y, dtype=np.float64))
+        wanted = len(x) * count
+        if wanted == 0:
+            return 0
+        room = self.allowance
+        if optional:
+            room = 0 if self.over_budget else room - self.budget // 4
+        allowed = max(0, min(wanted, room, self.capacity))
+        self.stats["dropped"] += wanted - allowed
+        if allowed == 0:
+            return 0
+        self.allowance -= allowed
+        self.stats["emitted"] += allowed
+
+        # spread what fits over all sources rather than starving the last ones
+        src = np.repeat(np.arange(len(x)), count)
+        if allowed < wanted:
+            src = src[np.linspace(0, wanted - 1, allowed).astype(np.int64)]
+        _, _, (lo, hi), (life_lo, life_hi), _ = STYLES[style]
+        rng = self.rng
+        angle = rng.uniform(0, 2 * math.pi, allowed)
+        speed = rng.uniform(lo, hi, allowed)
+        slots = (self.head + np.arange(allowed)) % self.capacity
+        self.head = (self.head + allowed) % self.capacity
+        self.x[slots] = x[src]
+        self.y[slots] = y[src]
+        self.vx[slots] = np.cos(angle) * speed + (vx[src] if np.ndim(vx) else vx)
+        self.vy[slots] = np.sin(angle) * speed + (vy[src] if np.ndim(vy) else vy)
+        self.age[slots] = 0.0
+        self.life[slots] = rng.uniform(life_lo, life_hi, allowed)
+        self.style[slots] = self.names.index(style)
+        return allowed
+
+    def update(self, dt):
+        alive = self.age < self.life
+        slots = np.flatnonzero(alive)
+        self.stats["alive"] = len(slots)
+        if len(slots) == 0:
+            return
+        damp = np.exp(-self.drag[self.style[slots]] * dt)
+        vx = self.vx[slots] * damp
+        vy = self.vy[slots] * damp
+        self.vx[slots] = vx
+        self.vy[slots] = vy
+        self.x[slots] += vx * dt
+        self.y[slots] += vy * dt
+        self.age[slots] += dt
+
+    def clear(self):
+        self.age[:] = 0.0
+        self.life[:] = 0.0
+        self.stats["alive"] = 0
+
+    def bake(self, surface, scale=1.0):
+        # One soft dot per style and fade step, shrinking and fading out
+        dots = self.surfaces[scale] = []
+        for name in self.names:
+            colour, radius = STYLES[name][:2]
+            for step in range(self.fade_steps):
+                left = 1 - step / self.fade_steps
+                r = max(1, round(radius * scale * (0.5 + 0.5 * left)))
+                dot = pygame.Surface((2 * r, 2 * r), pygame.SRCALPHA, pixel_format(surface))
+                pygame.draw.circle(dot, (*colour, round(120 * left)), (r, r), r)
+                pygame.draw.circle(dot, (*colour, round(255 * left)), (r, r), max(1, r * 2 // 3))
+                dots.append(dot)
+        return dots
+
+    def batch(self, surface, camera, batch, scale=1.0):
+        # Appends every live particle inside the view to batch, returns the count
+        x, y = self.x, self.y
+        left, top = camera.x, camera.y
+        right, bottom = left + camera.screen_w, top + camera.screen_h
+        live = np.flatnonzero((self.age < self.life) & (x >= left - 8) & (x <= right + 8) &
+                              (y >= top - 8) & (y <= bottom + 8))
+        if len(live) == 0:
+            return 0
+        dots = self.surfaces.get(scale) or self.bake(surface, scale)
+        steps = self.fade_steps
+        fade = np.minimum((self.age[live] / self.life[live] * steps).astype(np.int64), steps - 1)
+        index = (self.style[live] * steps + fade).tolist()
+        sx = ((x[live] - left) * scale).astype(np.int64).tolist()
+        sy = ((y[live] - top) * scale).astype(np.int64).tolist()
+        half = [dot.get_width() // 2 for dot in dots]
+        batch.extend([(dots[i], (px - half[i], py - half[i])) for i, px, py in zip(index, sx, sy)])
+        return len(live)
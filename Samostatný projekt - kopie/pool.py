@@ -0,0 +1,36 @@
+# === FREE LIST ===
+# Recycles entity objects instead of letting them go to the GC. Objects
+# must have reset(*args) taking the same arguments as the factory.
+class FreeList:
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+        self.acquired = 0
+        self.reused = 0
+        self.allocated = 0
+        self.frame_allocs = 0
+
+    def acquire(self, *args):
+        self.acquired += 1
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+            self.reused += 1
+            return obj
+        self.allocated += 1
+        self.frame_allocs += 1
+        return self.factory(*args)
+
+    def release(self, obj):
+        self.free.append(obj)
+
+    def begin_frame(self):
+        self.frame_allocs = 0
+
+    def stats(self):
+        return {
+            "size": self.allocated,
+            "free": len(self.free),
+            "reuse_rate": self.reused / self.acquired if self.acquired else 0.0,
+            "frame_allocs": self.frame_allocs,
+        }
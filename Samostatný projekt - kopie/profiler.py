@@ -0,0 +1,150 @@
+import csv
+import json
+import time
+from collections import deque
+
+import pygame
+
+# === FRAME PROFILER ===
+# Lap timer: lap(name) charges the time since the previous lap to that
+# phase. Phases hit several times in one frame (fixed-timestep catch-up)
+# add up. end_frame() pushes the totals into a rolling window per phase
+# and, when exporting, keeps one record per frame.
+class FrameProfiler:
+    def __init__(self, phases=(), history=300, record=False):
+        self.phases = list(phases)
+        self.history = history
+        self.window = {}  # phase -> deque of ms
+        self.frame = {}
+        self.record = record
+        self.records = []
+        self.frames = 0
+        self.last = time.perf_counter()
+        self.frame_start = self.last
+
+    def begin_frame(self):
+        self.frame = {}
+        self.last = self.frame_start = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.frame[name] = self.frame.get(name, 0.0) + (now - self.last) * 1000
+        self.last = now
+
+    def end_frame(self, counts=None):
+        total = (time.perf_counter() - self.frame_start) * 1000
+        self.frame["total"] = total
+        for name, ms in self.frame.items():
+            window = self.window.get(name)
+            if window is None:
+                window = self.window[name] = deque(maxlen=self.history)
+            window.append(ms)
+        if self.record:
+            row = {"frame": self.frames}
+            row.update((name, round(ms, 4)) for name, ms in self.frame.items())
+            if counts:
+                row.update(counts)
+            self.records.append(row)
+        self.frames += 1
+
+    def summary(self, name):
+        window = self.window.get(name)
+        if not window:
+            return {"last": 0.0, "mean": 0.0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+        values = sorted(window)
+        n = len(values)
+        return {
+            "last": window[-1],
+            "mean": sum(values) / n,
+            "p50": values[n // 2],
+            "p99": values[min(n - 1, int(n * 0.99))],
+            "max": values[-1],
+        }
+
+    def histogram(self, name, bins=10, upper=None):
+        # Bucket counts of the rolling window, from 0 to upper (default max)
+        window = self.window.get(name)
+        if not window:
+            return [0] * bins, 0.0
+        upper = upper or max(window) or 1.0
+        counts = [0] * bins
+        for ms in window:
+            counts[min(bins - 1, int(ms / upper * bins))] += 1
+        return counts, upper
+
+    def export(self, path):
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump(self.records, f)
+            return
+        fields = ["frame"] + self.phases + ["total"]
+        for row in self.records:
+            for key in row:
+                if key not in fields:
+                    fields.append(key)
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields, restval=0)
+            writer.writeheader()
+            writer.writerows(self.records)
+
+class NullProfiler:
+    def lap(self, name):
+        pass
+
+NULL_PROFILER = NullProfiler()
+
+# === STARTUP TRACE ===
+# Same lap idea for the one-off steps between launch and the first frame
+class StartupTrace:
+    def __init__(self, start=None):
+        self.start = self.last = start or time.perf_counter()
+        self.steps = []  # (name, ms)
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.steps.append((name, (now - self.last) * 1000))
+        self.last = now
+
+    def report(self):
+        lines = [f"{name:<20} {ms:8.1f} ms" for name, ms in self.steps]
+        lines.append(f"{'time to first frame':<20} {(self.last - self.start) * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+# === OVERLAY ===
+# Per-phase ms and entity counts in the top-left corner. The text is only
+# re-rendered a few times a second so the overlay barely shows up in itself.
+class ProfilerOverlay:
+    def __init__(self, font, refresh=0.25):
+        self.font = font
+        self.refresh = refresh
+        self.visible = False
+        self.surface = None
+        self.next_refresh = 0.0
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.next_refresh = 0.0
+
+    def draw(self, surface, profiler, counts):
+        if not self.visible:
+            return None
+        now = time.perf_counter()
+        if self.surface is None or now >= self.next_refresh:
+            self.surface = self.render(profiler, counts)
+            self.next_refresh = now + self.refresh
+        return surface.blit(self.surface, (10, 10))
+
+    def render(self, profiler, counts):
+        lines = ["phase              last    p50    p99  (ms)"]
+        for name in profiler.phases + ["total"]:
+            s = profiler.summary(name)
+            lines.append(f"{name:<16} {s['last']:6.2f} {s['p50']:6.2f} {s['p99']:6.2f}")
+        lines.append("  ".join(f"{key} {value}" for key, value in counts.items()))
+        height = self.font.get_linesize()
+        rendered = [self.font.render(line, True, (255,255,255)) for line in lines]
+        width = max(r.get_width() for r in rendered) + 12
+        panel = pygame.Surface((width, height * len(lines) + 12), pygame.SRCALPHA)
+        panel.fill((0,0,0,160))
+        for i, r in enumerate(rendered):
+            panel.blit(r, (6, 6 + i * height))
+        return panel
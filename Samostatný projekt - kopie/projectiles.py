@@ -0,0 +1,158 @@
+import numpy as np
+
+# === PROJECTILES ===
+# Struct-of-arrays storage for every fireball in flight, packed in slots
+# [0, n) like the Horde. Each one homes in on a zombie view and is dropped
+# once that view is reissued (gen changed) or the zombie is dead.
+#
+# step() moves all of them at once and never overshoots: a projectile
+# travels min(speed * dt, distance to target). Hits are swept: the segment
+# it covered this tick is tested against the circles (hitbox + radius) of
+# the zombies in the cells around it, so the first zombie in its path is
+# hit whatever the frame rate. Damage is applied in one np.subtract.at().
+class Projectiles:
+    FIELDS = ("x", "y", "prev_x", "prev_y", "speed", "damage", "target_gen")
+
+    def __init__(self, capacity=64, radius=8):
+        self.n = 0
+        self.capacity = capacity
+        self.radius = radius
+        for name in self.FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float64))
+        self.targets = []  # ZombieView per slot
+        self.hits = 0
+        self.impact_x = self.impact_y = np.zeros(0)  # where the last step's hits landed
+
+    def __len__(self):
+        return self.n
+
+    def __bool__(self):
+        return self.n > 0
+
+    def _grow(self):
+        self.capacity *= 2
+        for name in self.FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(self.capacity, dtype=old.dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+
+    def spawn(self, x, y, target, damage=25, speed=350):
+        if self.n == self.capacity:
+            self._grow()
+        i = self.n
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.speed[i] = speed
+        self.damage[i] = damage
+        self.target_gen[i] = target.gen
+        self.targets.append(target)
+        self.n += 1
+        return i
+
+    def clear(self):
+        self.n = 0
+        self.targets.clear()
+        self.impact_x = self.impact_y = np.zeros(0)
+
+    def store_previous(self):
+        n = self.n
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def render_positions(self, alpha=1.0):
+        n = self.n
+        px, py = self.prev_x[:n], self.prev_y[:n]
+        return px + (self.x[:n] - px) * alpha, py + (self.y[:n] - py) * alpha
+
+    def target_slots(self, horde):
+        # Horde slot of every projectile's target, -1 where it is gone
+        n = self.n
+        slots = np.fromiter((t.slot for t in self.targets), dtype=np.int64, count=n)
+        gens = np.fromiter((t.gen for t in self.targets), dtype=np.float64, count=n)
+        slots[gens != self.target_gen[:n]] = -1
+        alive = slots >= 0
+        slots[alive & (horde.hp[np.maximum(slots, 0)] <= 0)] = -1
+        return slots
+
+    def step(self, dt, horde):
+        # Returns the number of hits this step
+        n = self.n
+        self.impact_x = self.impact_y = np.zeros(0)  # only this step's hits make sparks
+        if n == 0:
+            return 0
+        slots = self.target_slots(horde)
+        live = slots >= 0
+        safe = np.maximum(slots, 0)
+        x0, y0 = self.x[:n].copy(), self.y[:n].copy()
+        dx = np.where(live, horde.x[safe] - x0, 0.0)
+        dy = np.where(live, horde.y[safe] - y0, 0.0)
+        dist = np.hypot(dx, dy)
+        scale = np.minimum(self.speed[:n] * dt, dist) / np.maximum(dist, 1e-9)
+        x1 = x0 + dx * scale
+        y1 = y0 + dy * scale
+        self.x[:n] = x1
+        self.y[:n] = y1
+
+        hit = self.sweep(horde, x0, y0, x1, y1, np.flatnonzero(live))
+        dead = ~live
+        if len(hit[0]):
+            shots, victims = hit
+            self.impact_x, self.impact_y = horde.x[victims], horde.y[victims]
+            np.subtract.at(horde.hp, victims, self.damage[shots])
+            dead[shots] = True
+            self.hits += len(shots)
+        if dead.any():
+            self.remove(dead)
+        return len(hit[0])
+
+    def sweep(self, horde, x0, y0, x1, y1, shots):
+        # (shot, zombie slot) of the first live zombie each shot's segment
+        # enters this step
+        none = (shots[:0], shots[:0])
+        if len(shots) == 0 or horde.n == 0:
+            return none
+        reach = horde.hitbox_radius + self.radius
+        sx, sy = x0[shots], y0[shots]
+        ex, ey = x1[shots] - sx, y1[shots] - sy
+        seg = np.hypot(ex, ey)
+        cx, cy = sx + ex * 0.5, sy + ey * 0.5
+        radius = seg * 0.5 + reach
+        index = horde._index()
+        if radius.max() > index.cell_size:
+            radius = np.minimum(radius, index.cell_size)  # faster than a cell per tick: clip the search
+        q, z = index.pairs(cx, cy, radius)
+        if len(q) == 0:
+            return none
+        keep = horde.hp[z] > 0
+        q, z = q[keep], z[keep]
+
+        # Closest approach along the segment, then back up to where the
+        # segment enters the circle; t in [0, 1] along the segment
+        length2 = np.maximum(seg[q] * seg[q], 1e-12)
+        rx, ry = horde.x[z] - sx[q], horde.y[z] - sy[q]
+        t = np.clip((rx * ex[q] + ry * ey[q]) / length2, 0.0, 1.0)
+        px, py = rx - ex[q] * t, ry - ey[q] * t
+        d2 = px * px + py * py
+        inside = d2 <= reach * reach
+        if not inside.any():
+            return none
+        q, z, t, d2 = q[inside], z[inside], t[inside], d2[inside]
+        t = np.maximum(t - np.sqrt(reach * reach - d2) / np.sqrt(length2[inside]), 0.0)
+
+        # earliest entry per shot
+        order = np.lexsort((t, q))
+        q, z = q[order], z[order]
+        first = np.flatnonzero(np.r_[True, q[1:] != q[:-1]])
+        return shots[q[first]], z[first]
+
+    def remove(self, dead):
+        # Compact the survivors to the front, keeping their order
+        keep = np.flatnonzero(~dead)
+        m = len(keep)
+        for name in self.FIELDS:
+            arr = getattr(self, name)
+            arr[:m] = arr[keep]
+        targets = self.targets
+        self.targets = [targets[i] for i in keep.tolist()]
+        self.n = m
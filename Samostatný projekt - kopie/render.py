@@ -0,0 +1,229 @@
+import numpy as np
+import pygame
+
+from profiler import NULL_PROFILER
+
+# Surface whose pixel format sprites baked for target should use. Texture
+# canvases (render_sdl.py) name one, a plain Surface is its own.
+def pixel_format(target):
+    return getattr(target, "format_surface", target)
+
+# === WORLD RENDERER ===
+# Draws level, zombies, fireballs and the player. Anything whose sprite
+# can't reach the camera view is skipped before any draw call is made.
+# Zombie sprites, their HP bars and fireballs go to the screen in a single
+# Surface.blits() call; HP bars come from one pre-rendered surface per
+# pixel of fill. Sprites are atlas cells picked by heading and animation
+# frame (atlas.py). With track_rects the screen rect of every drawn sprite
+# ends up in rects.
+#
+# draw() takes a scale for rendering into a smaller internal surface (see
+# governor.py): culling stays in world units, positions are scaled and
+# sprites, HP bars and particles come pre-baked at that scale.
+class WorldRenderer:
+    HP_BAR_W, HP_BAR_H, HP_BAR_Y = 40, 5, -40
+    HP_BAR_BG = (0,0,0)
+    HP_BAR_FG = (200,50,50)
+
+    def __init__(self, track_rects=False):
+        self.stats = {"drawn": 0, "culled": 0, "particles": 0}
+        self.track_rects = track_rects
+        self.rects = []
+        self.profiler = NULL_PROFILER
+        self.hp_bars = {}  # scale -> bars
+
+    @staticmethod
+    def sprite_pad(atlas, radius):
+        # Half the atlas slot's larger side, enough for any part of a sprite to show
+        if atlas:
+            return max(atlas.cell_w, atlas.cell_h) // 2 + 1
+        return radius + 1
+
+    def hp_bar_surfaces(self, surface, scale=1.0):
+        # Same pixels Zombie.draw() produced: black bar, int(40 * ratio) px of red
+        bars = self.hp_bars.get(scale)
+        if bars is None:
+            bars = self.hp_bars[scale] = []
+            w, h = round(self.HP_BAR_W * scale), max(1, round(self.HP_BAR_H * scale))
+            for fill in range(w + 1):
+                bar = pygame.Surface((w, h), 0, pixel_format(surface))
+                bar.fill(self.HP_BAR_BG)
+                bar.fill(self.HP_BAR_FG, (0, 0, fill, h))
+                bars.append(bar)
+        return bars
+
+    def zombie_batch(self, surface, enemies, player, camera, slots, alpha, batch, scale=1.0):
+        atlas = enemies.views[0].atlas_at(scale)  # shared by every zombie through the asset cache
+        x, y = enemies.render_positions(slots, alpha)
+        cx = ((x - camera.x) * scale).astype(np.int64)
+        cy = ((y - camera.y) * scale).astype(np.int64)
+
+        # face the way they moved last tick, zombies standing still face the player
+        hx = enemies.x[slots] - enemies.prev_x[slots]
+        hy = enemies.y[slots] - enemies.prev_y[slots]
+        still = (hx == 0) & (hy == 0)
+        hx = np.where(still, player.x - x, hx)
+        hy = np.where(still, player.y - y, hy)
+        frames = (atlas.frame_at(enemies.time) + slots) % atlas.frames
+        cells = frames * atlas.rotations + atlas.buckets(hx, hy)
+        sheet = atlas.cells
+        sx = (cx + atlas.offset_x[cells]).tolist()
+        sy = (cy + atlas.offset_y[cells]).tolist()
+        cells = cells.tolist()
+        bars = self.hp_bar_surfaces(surface, scale)
+        bar_w = len(bars) - 1
+        bx = (cx - bar_w // 2).tolist()
+        by = (cy + round(self.HP_BAR_Y * scale)).tolist()
+        ratio = np.maximum(enemies.hp[slots] / enemies.max_hp[slots], 0)
+        fill = np.minimum((bar_w * ratio).astype(np.int64), bar_w).tolist()
+        for i in range(len(sx)):
+            batch.append((sheet[cells[i]], (sx[i], sy[i])))
+            batch.append((bars[fill[i]], (bx[i], by[i])))
+
+    def draw(self, surface, world, camera, alpha=1.0, scale=1.0):
+        world.level.draw(surface, camera, scale)
+        self.profiler.lap("level_draw")
+        left, top = camera.x, camera.y
+        right, bottom = left + camera.screen_w, top + camera.screen_h
+        drawn = culled = 0
+        rects = self.rects = [] if self.track_rects else None
+        batch = []
+
+        enemies = world.enemies
+        if enemies:
+            views = enemies.views
+            first = views[0]
+            atlas = first.atlas
+            pad = max(self.sprite_pad(atlas, first.hitbox_radius), 45)  # HP bar sits 40 px above
+            visible = enemies.visible(left - pad, top - pad, right + pad, bottom + pad, alpha)
+            if atlas:
+                self.zombie_batch(surface, enemies, world.player, camera, visible, alpha, batch, scale)
+            else:
+                for i in visible.tolist():
+                    rect = views[i].draw(surface, camera, alpha, scale)
+                    if rects is not None:
+                        rects.append(rect)
+            drawn += len(visible)
+            culled += len(enemies) - len(visible)
+
+        # under the fireballs, over the zombies they hit
+        if world.particles is not None:
+            self.stats["particles"] = world.particles.batch(surface, camera, batch, scale)
+
+        fireballs = world.fireballs
+        if fireballs:
+            atlas = fireballs.atlas
+            pad = self.sprite_pad(atlas, fireballs.radius)
+            x, y = fireballs.render_positions(alpha)
+            visible = np.flatnonzero((x >= left - pad) & (x <= right + pad) & (y >= top - pad) & (y <= bottom + pad))
+            if atlas:
+                atlas = fireballs.atlas_at(scale)
+                n = fireballs.n
+                buckets = atlas.buckets(fireballs.x[:n] - fireballs.prev_x[:n], fireballs.y[:n] - fireballs.prev_y[:n])
+                buckets = buckets[visible]
+                sheet = atlas.cells
+                sx = (((x[visible] - camera.x) * scale).astype(np.int64) + atlas.offset_x[buckets]).tolist()
+                sy = (((y[visible] - camera.y) * scale).astype(np.int64) + atlas.offset_y[buckets]).tolist()
+                batch.extend(zip([sheet[b] for b in buckets.tolist()], zip(sx, sy)))
+            else:
+                for i in visible.tolist():
+                    rect = fireballs.draw(surface, camera, i, alpha, scale)
+                    if rects is not None:
+                        rects.append(rect)
+            drawn += len(visible)
+            culled += len(fireballs) - len(visible)
+
+        if batch:
+            if rects is not None:
+                rects.extend(surface.blits(batch))
+            else:
+                surface.blits(batch, False)
+
+        rect = world.player.draw(surface, camera, alpha, scale)
+        if rects is not None:
+            rects.append(rect)
+        drawn += 1
+
+        self.stats["drawn"] = drawn
+        self.stats["culled"] = culled
+        self.profiler.lap("entity_draw")
+
+# === RENDER BACKENDS ===
+# What main() draws through: canvas is the full-screen target, layer()
+# the target for the world at a render scale (see governor.py), compose()
+# stretches a layer over the canvas and present() shows the frame.
+# SurfaceBackend is the software path on the display Surface;
+# render_sdl.TextureBackend does the same through an SDL Renderer.
+class SurfaceBackend:
+    name = "surface"
+
+    def __init__(self, screen):
+        self.canvas = screen
+        self.layers = {}  # (w, h) -> internal world surface
+
+    def layer(self, scale, smooth=False):
+        if scale == 1.0:
+            return self.canvas
+        w, h = self.canvas.get_size()
+        size = (round(w * scale), round(h * scale))
+        surface = self.layers.get(size)
+        if surface is None:
+            surface = self.layers[size] = pygame.Surface(size, 0, self.canvas)
+        return surface
+
+    def compose(self, layer, smooth=False):
+        if layer is self.canvas:
+            return
+        if smooth:
+            pygame.transform.smoothscale(layer, self.canvas.get_size(), self.canvas)
+        else:
+            pygame.transform.scale(layer, self.canvas.get_size(), self.canvas)
+
+    def present(self):
+        pygame.display.flip()
+
+    def read_pixels(self):
+        return self.canvas.copy()
+
+# === DIRTY RECT PRESENTER ===
+# Pushes only the screen areas that changed since the last frame: where
+# sprites are now, where they were, and HUD parts that were re-rendered.
+# A scrolling camera changes every pixel, so that falls back to flip().
+class DirtyRectPresenter:
+    def __init__(self, screen_w, screen_h, max_dirty_fraction=0.35):
+        self.screen_rect = pygame.Rect(0, 0, screen_w, screen_h)
+        self.max_dirty_area = screen_w * screen_h * max_dirty_fraction
+        self.prev_rects = []
+        self.prev_camera = None
+        self.full_flips = 0
+        self.partial_updates = 0
+
+    def present(self, camera, rects, hud_rects=()):
+        cam = (camera.x, camera.y)
+        dirty = rects + self.prev_rects
+        dirty.extend(hud_rects)
+        self.prev_rects = rects
+        if cam != self.prev_camera:
+            self.prev_camera = cam
+            return self.flip()
+
+        clipped = [r.clip(self.screen_rect) for r in dirty]
+        clipped = [r for r in clipped if r.w and r.h]
+        if sum(r.w * r.h for r in clipped) > self.max_dirty_area:
+            return self.flip()
+        if clipped:
+            pygame.display.update(clipped)
+        self.partial_updates += 1
+        return clipped
+
+    def present_full(self):
+        # Every pixel changed some other way (an upscaled world layer); the
+        # next present() can't rely on the old rects and flips as well
+        self.prev_camera = None
+        self.prev_rects = []
+        return self.flip()
+
+    def flip(self):
+        pygame.display.flip()
+        self.full_flips += 1
+        return [self.screen_rect]
@@ -0,0 +1,113 @@
+import argparse
+import json
+import os
+import statistics
+import time
+
+import pygame
+
+import headless
+import main
+from assets import assets
+from particles import ParticleSystem
+from render import WorldRenderer, SurfaceBackend
+from governor import FrameGovernor
+
+# === RENDER BACKEND BENCHMARK ===
+# Draws the same scene with each backend: a seeded world with a ring of
+# zombies closing in on the player under a stream of fireballs, stepped
+# one tick per frame so the horde, particles and animation frames match
+# frame for frame. Times drawing and present() separately; a hardware
+# renderer may only queue work in draw and do it in present, so compare
+# the totals. --save-frames writes each backend's last frame as a PNG.
+def build_scene(args):
+    world = main.World(seed=args.seed, fire_interval=args.fire_interval, fire_interval_min=args.fire_interval)
+    world.particles = ParticleSystem(seed=args.seed)
+    world.player.invulnerable = True
+    headless.spawn_ring(world, args.zombies, args.radius)
+    return world
+
+def open_backend(name, args):
+    if name == "sdl":
+        from render_sdl import TextureBackend
+        return TextureBackend((main.SCREEN_W, main.SCREEN_H), "render bench sdl", driver=args.render_driver)
+    return SurfaceBackend(pygame.display.get_surface())
+
+def bench(name, args):
+    backend = open_backend(name, args)
+    world = build_scene(args)
+    camera = main.Camera(main.SCREEN_W, main.SCREEN_H, world.level.width, world.level.height)
+    renderer = WorldRenderer()
+    governor = FrameGovernor()
+    governor.set_level(args.quality)
+    governor.apply(world)
+    keys = headless.NO_KEYS
+    dt = 1 / main.TICK_RATE
+    draw_ms, present_ms = [], []
+    for frame in range(args.warmup + args.frames):
+        world.particles.begin_frame()
+        world.step(dt, keys)
+        world.particles.update(dt)
+        camera.update(world.player.x, world.player.y)
+
+        start = time.perf_counter()
+        layer = governor.world_surface(backend)
+        renderer.draw(layer, world, camera, 1.0, governor.scale)
+        governor.upscale(layer, backend)
+        drawn = time.perf_counter()
+        backend.present()
+        done = time.perf_counter()
+        if frame >= args.warmup:
+            draw_ms.append((drawn - start) * 1000)
+            present_ms.append((done - drawn) * 1000)
+
+    if args.save_frames:
+        pygame.image.save(backend.read_pixels(), os.path.join(args.save_frames, f"bench-{name}.png"))
+    total = sorted(d + p for d, p in zip(draw_ms, present_ms))
+    return {
+        "backend": name,
+        "driver": getattr(backend, "driver", "-"),
+        "frames": args.frames,
+        "zombies": len(world.enemies),
+        "drawn": renderer.stats["drawn"],
+        "particles": renderer.stats["particles"],
+        "draw_ms": round(statistics.fmean(draw_ms), 3),
+        "present_ms": round(statistics.fmean(present_ms), 3),
+        "p50_ms": round(headless.percentile(total, 0.5), 3),
+        "p99_ms": round(headless.percentile(total, 0.99), 3),
+    }
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", default="surface,sdl", help="comma separated, from surface and sdl")
+    parser.add_argument("--render-driver", help="SDL render driver for the sdl backend, e.g. software or opengl")
+    parser.add_argument("--zombies", type=int, default=1000)
+    parser.add_argument("--radius", type=float, default=900, help="ring radius the horde starts on")
+    parser.add_argument("--fire-interval", type=float, default=0.05)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=60, help="untimed frames first, textures get uploaded here")
+    parser.add_argument("--quality", type=int, choices=range(3), default=0, help="governor level, 0 is full resolution")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-frames", help="directory to write each backend's last frame to")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    pygame.display.init()
+    pygame.display.set_mode((main.SCREEN_W, main.SCREEN_H))
+    assets.preload(atlases=main.SPRITES + FrameGovernor().scaled_sprites(main.SPRITES)).join()
+    try:
+        results = [bench(name, args) for name in args.backends.split(",")]
+    except ValueError as err:
+        parser.error(str(err))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return results
+    print(f"{'backend':<8} {'driver':<10} {'draw':>8} {'present':>8} {'p50':>8} {'p99':>8}  (ms per frame)")
+    for r in results:
+        print(f"{r['backend']:<8} {r['driver']:<10} {r['draw_ms']:8.2f} {r['present_ms']:8.2f} "
+              f"{r['p50_ms']:8.2f} {r['p99_ms']:8.2f}  {r['drawn']} sprites, {r['particles']} particles")
+    return results
+
+if __name__ == "__main__":
+    cli()
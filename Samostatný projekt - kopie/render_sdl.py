@@ -0,0 +1,168 @@
+import os
+import weakref
+
+import pygame
+from pygame._sdl2.video import Renderer, Texture, Window, get_drivers
+
+# === SDL TEXTURE BACKEND ===
+# The same drawing calls as the Surface path, carried out by an SDL
+# Renderer. Every Surface handed to blit()/blits() is uploaded once as a
+# Texture and drawn as a textured copy from then on: sprites, HP bars,
+# particle dots and the level's grid tile. Atlas cells are subsurfaces of
+# one sheet, so a whole sheet is one texture and a cell is a source rect
+# into it. Surfaces redrawn in place (HUD bars, minimap) must be
+# refresh()ed to be uploaded again.
+#
+# driver picks the SDL render driver by name ("opengl", "software", ...).
+# By default SDL takes the first hardware one it can create and falls
+# back to its software renderer, which is what runs on a box without a
+# GPU and under the dummy video driver.
+#
+# The window comes from pygame._sdl2, not display.set_mode(): SDL won't
+# put a Renderer on the display module's window once it has a surface.
+# main() still opens a hidden 1x1 display so convert() and convert_alpha()
+# have a pixel format to work with.
+class TextureBackend:
+    name = "sdl"
+
+    def __init__(self, size, title="", driver=None, vsync=False):
+        self.window = Window(title, size)
+        index = -1
+        if driver:
+            names = [info.name for info in get_drivers()]
+            if driver not in names:
+                raise ValueError(f"unknown SDL render driver {driver!r}, this SDL has {', '.join(names)}")
+            index = names.index(driver)
+        try:
+            self.renderer = Renderer(self.window, index=index, vsync=vsync)
+        except RuntimeError as err:  # pygame._sdl2 reports SDL failures as RuntimeErrors
+            self.window.destroy()
+            raise ValueError(f"can't create an SDL renderer ({driver or 'any driver'}): {err}") from err
+        self.driver = driver or "auto"
+        self.format_surface = pygame.display.get_surface() or pygame.Surface((1, 1), 0, 32)
+        self.textures = weakref.WeakKeyDictionary()  # Surface -> (Texture, source rect)
+        self.canvas = TextureCanvas(self, size)
+        self.layers = {}  # (size, smooth) -> canvas over a target texture
+        self.bound = None  # canvas the renderer currently draws into
+        self.uploads = 0
+
+    def texture(self, source):
+        entry = self.textures.get(source)
+        if entry is None:
+            parent = source.get_abs_parent()
+            if parent is not source:
+                texture = self.texture(parent)[0]
+                entry = (texture, pygame.Rect(source.get_abs_offset(), source.get_size()))
+            else:
+                texture = Texture.from_surface(self.renderer, source)
+                self.uploads += 1
+                entry = (texture, source.get_rect())
+            self.textures[source] = entry
+        return entry
+
+    def refresh(self, source):
+        entry = self.textures.get(source)
+        if entry is not None:
+            entry[0].update(source)
+            self.uploads += 1
+
+    def bind(self, canvas):
+        if self.bound is not canvas:
+            self.renderer.target = canvas.texture
+            self.bound = canvas
+
+    def layer(self, scale, smooth=False):
+        if scale == 1.0:
+            return self.canvas
+        w, h = self.canvas.get_size()
+        size = (round(w * scale), round(h * scale))
+        canvas = self.layers.get((size, smooth))
+        if canvas is None:
+            # the scale mode is taken from this hint when a texture is created
+            os.environ["SDL_RENDER_SCALE_QUALITY"] = "linear" if smooth else "nearest"
+            canvas = TextureCanvas(self, size, Texture(self.renderer, size, target=True))
+            self.layers[(size, smooth)] = canvas
+        return canvas
+
+    def compose(self, layer, smooth=False):
+        if layer is self.canvas:
+            return
+        self.bind(self.canvas)
+        layer.texture.draw(None, (0, 0, *self.canvas.get_size()))
+
+    def present(self):
+        self.bind(self.canvas)
+        self.renderer.present()
+
+    def read_pixels(self):
+        # What was drawn to the window, for tests and screenshots
+        self.bind(self.canvas)
+        return self.renderer.to_surface()
+
+# Render target with the part of the Surface interface the renderer, HUD
+# and overlay use: blit(), blits() of (source, pos) pairs, fill() and the
+# size getters. texture is None for the window itself.
+class TextureCanvas:
+    def __init__(self, backend, size, texture=None):
+        self.backend = backend
+        self.size = size
+        self.texture = texture
+        self.format_surface = backend.format_surface
+
+    def get_size(self):
+        return self.size
+
+    def get_width(self):
+        return self.size[0]
+
+    def get_height(self):
+        return self.size[1]
+
+    def get_bitsize(self):
+        return self.format_surface.get_bitsize()
+
+    def get_rect(self):
+        return pygame.Rect((0, 0), self.size)
+
+    def blit(self, source, dest, area=None):
+        backend = self.backend
+        backend.bind(self)
+        texture, src = backend.texture(source)
+        if area is not None:
+            area = pygame.Rect(area).clip(source.get_rect())
+            src = area.move(src.x, src.y)
+        rect = pygame.Rect(dest[0], dest[1], src.w, src.h)
+        texture.draw(src, rect)
+        return rect
+
+    def blits(self, blit_sequence, doreturn=True):
+        backend = self.backend
+        backend.bind(self)
+        lookup = backend.texture
+        seen = {}  # id -> entry; the sources stay alive for the whole call
+        rects = [] if doreturn else None
+        for source, dest in blit_sequence:
+            entry = seen.get(id(source))
+            if entry is None:
+                entry = seen[id(source)] = lookup(source)
+            texture, src = entry
+            rect = (dest[0], dest[1], src.w, src.h)
+            texture.draw(src, rect)
+            if doreturn:
+                rects.append(pygame.Rect(rect))
+        return rects
+
+    def fill(self, color, rect=None):
+        backend = self.backend
+        backend.bind(self)
+        renderer = backend.renderer
+        renderer.draw_color = pygame.Color(color)
+        if rect is None:
+            renderer.clear()
+            return self.get_rect()
+        rect = pygame.Rect(rect)
+        renderer.fill_rect(rect)
+        return rect
+
+    def refresh(self, source):
+        self.backend.refresh(source)
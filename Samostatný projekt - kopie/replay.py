@@ -0,0 +1,175 @@
+import struct
+import sys
+import zlib
+from array import array
+
+import pygame
+
+# === KEY MASKS ===
+# WASD state of one tick as 4 bits
+KEY_BITS = ((pygame.K_w, 1), (pygame.K_a, 2), (pygame.K_s, 4), (pygame.K_d, 8))
+
+def key_mask(keys):
+    mask = 0
+    for key, bit in KEY_BITS:
+        if keys[key]:
+            mask |= bit
+    return mask
+
+# Stands in for pygame.key.get_pressed() during a replay
+class MaskKeys:
+    __slots__ = ("mask",)
+    BITS = dict(KEY_BITS)
+
+    def __init__(self, mask):
+        self.mask = mask
+
+    def __getitem__(self, key):
+        return bool(self.mask & self.BITS.get(key, 0))
+
+MASK_KEYS = [MaskKeys(mask) for mask in range(16)]
+
+# === CHECKSUM ===
+# CRC of the state a replay has to reproduce: player, timers, every zombie
+# and fireball position
+def world_checksum(world):
+    player, enemies = world.player, world.enemies
+    n = enemies.n
+    crc = zlib.crc32(struct.pack("<5d3i3d", player.x, player.y, player.hp, player.xp, world.time,
+                                 player.level, player.kills, world.ticks,
+                                 world.spawn_timer, world.fire_timer, world.fire_timer_reset))
+    for a in (enemies.x, enemies.y, enemies.hp):
+        crc = zlib.crc32(a[:n].tobytes(), crc)
+    fireballs = world.fireballs
+    for a in (fireballs.x, fireballs.y):
+        crc = zlib.crc32(a[:fireballs.n].tobytes(), crc)
+    return crc
+
+# === FILE FORMAT ===
+# Header, then one varint per run of ticks with the same keys:
+# (run length << 4) | (mask XOR previous run's mask), then one uint32
+# checksum every checksum_interval ticks. A key change costs one or two
+# bytes, holding the same keys costs nothing.
+MAGIC = b"ZREC"
+VERSION = 2
+HEADER = struct.Struct("<4sHQd?IIII")  # magic, version, seed, tick_dt, LOD on, ticks, checksum interval, run bytes, checksums
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def little_endian(a):
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a
+
+# === RECORDER ===
+class InputRecorder:
+    def __init__(self, seed, tick_dt, checksum_interval=600, lod=True):
+        self.seed = seed
+        self.tick_dt = tick_dt
+        self.lod = lod
+        self.checksum_interval = checksum_interval
+        self.runs = []  # [mask, ticks]
+        self.checksums = array("I")
+        self.ticks = 0
+
+    # Call after each World.step() with the keys that step used
+    def record(self, world, keys):
+        mask = key_mask(keys)
+        if self.runs and self.runs[-1][0] == mask:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([mask, 1])
+        self.ticks += 1
+        if self.checksum_interval and self.ticks % self.checksum_interval == 0:
+            self.checksums.append(world_checksum(world))
+
+    def encode(self):
+        runs = bytearray()
+        prev = 0
+        for mask, count in self.runs:
+            write_varint(runs, count << 4 | (mask ^ prev))
+            prev = mask
+        checksums = little_endian(array("I", self.checksums)).tobytes()
+        header = HEADER.pack(MAGIC, VERSION, self.seed, self.tick_dt, self.lod, self.ticks,
+                             self.checksum_interval, len(runs), len(self.checksums))
+        return header + bytes(runs) + checksums
+
+    def save(self, path):
+        data = self.encode()
+        with open(path, "wb") as f:
+            f.write(data)
+        return len(data)
+
+# === REPLAY ===
+# Hands back the recorded keys tick by tick. With verify, keys_for()
+# compares the world against the recorded checksum before each tick that
+# follows a checkpoint; mismatch holds the first tick that diverged.
+class Replay:
+    def __init__(self, seed, tick_dt, masks, checksums, checksum_interval, lod=True):
+        self.seed = seed
+        self.tick_dt = tick_dt
+        self.lod = lod
+        self.masks = masks  # one byte per tick
+        self.ticks = len(masks)
+        self.checksums = checksums
+        self.checksum_interval = checksum_interval
+        self.verify = False
+        self.verified = 0
+        self.mismatch = None
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, seed, tick_dt, lod, ticks, interval, run_bytes, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} input recording")
+        masks = bytearray()
+        pos = end = HEADER.size
+        end += run_bytes
+        mask = 0
+        while pos < end:
+            value, pos = read_varint(data, pos)
+            mask ^= value & 0xF
+            masks += bytes((mask,)) * (value >> 4)
+        if len(masks) != ticks:
+            raise ValueError(f"{path}: runs cover {len(masks)} ticks, header says {ticks}")
+        checksums = array("I")
+        checksums.frombytes(data[end:end + 4 * count])
+        return cls(seed, tick_dt, bytes(masks), little_endian(checksums), interval, lod)
+
+    def done(self, world):
+        return world.ticks >= self.ticks
+
+    def check(self, world):
+        interval = self.checksum_interval
+        if not interval or world.ticks == 0 or world.ticks % interval:
+            return True
+        i = world.ticks // interval - 1
+        if i >= len(self.checksums):
+            return True
+        if world_checksum(world) != self.checksums[i]:
+            if self.mismatch is None:
+                self.mismatch = world.ticks
+            return False
+        self.verified += 1
+        return True
+
+    def keys_for(self, world):
+        if self.verify:
+            self.check(world)
+        return MASK_KEYS[self.masks[world.ticks]]
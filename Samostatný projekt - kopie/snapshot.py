@@ -0,0 +1,147 @@
+import struct
+import sys
+from array import array
+
+import numpy as np
+
+# === SNAPSHOT FORMAT ===
+# Fixed-size records packed with struct, then the variable parts as raw
+# arrays: Mersenne Twister state, blocked cells, one float64 column per
+# Horde field, the LOD region of every slot and one row per fireball.
+# Fireballs point at their target by zombie slot. Everything is
+# little-endian.
+MAGIC = b"ZSNP"
+VERSION = 2
+HEADER = struct.Struct("<4sH")
+WORLD = struct.Struct("<dI?3d9d")  # time, ticks, game_over, spawn/fire timers, fire_timer_reset, TUNING
+RNG = struct.Struct("<i?dI")  # version, has gauss_next, gauss_next, state length
+PLAYER = struct.Struct("<7d5qd?")
+LEVEL = struct.Struct("<qI")  # nav_version, blocked cells
+CAMERA = struct.Struct("<qq")
+COUNT = struct.Struct("<I")
+LOD = struct.Struct("<?q?")  # LOD scheduler present, its tick count, split still current
+FIREBALL_FIELDS = ("x", "y", "prev_x", "prev_y", "speed", "damage")
+
+def little_endian(a):
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a
+
+def snapshot(world):
+    player, level, camera = world.player, world.level, world.camera
+    enemies, fireballs = world.enemies, world.fireballs
+    out = [HEADER.pack(MAGIC, VERSION)]
+
+    out.append(WORLD.pack(world.time, world.ticks, world.game_over, world.spawn_timer,
+                          world.fire_timer, world.fire_timer_reset,
+                          *(getattr(world, name) for name in world.TUNING)))
+
+    version, state, gauss = world.rng.getstate()
+    out.append(RNG.pack(version, gauss is not None, gauss or 0.0, len(state)))
+    out.append(little_endian(array("I", state)).tobytes())
+
+    out.append(PLAYER.pack(player.x, player.y, player.prev_x, player.prev_y, player.speed, player.hp, player.xp,
+                           player.radius, player.max_hp, player.level, player.xp_to_next, player.kills,
+                           player.xp_growth, player.invulnerable))
+
+    out.append(LEVEL.pack(level.nav_version, len(level.blocked)))
+    out.append(little_endian(array("i", [c for cell in sorted(level.blocked) for c in cell])).tobytes())
+    out.append(CAMERA.pack(camera.x, camera.y))
+
+    n = enemies.n
+    out.append(COUNT.pack(n))
+    for name in enemies.FIELDS:
+        out.append(getattr(enemies, name)[:n].astype("<f8").tobytes())
+    lod = world.lod
+    out.append(LOD.pack(lod is not None, lod.ticks if lod else 0, bool(lod) and lod.version == enemies.version))
+    if lod:
+        out.append(lod.region_codes(enemies).tobytes())
+
+    # a fireball whose target is gone would be dropped on its next step anyway
+    slots = fireballs.target_slots(enemies)
+    keep = np.flatnonzero(slots >= 0)
+    out.append(COUNT.pack(len(keep)))
+    rows = np.stack([getattr(fireballs, name)[keep] for name in FIREBALL_FIELDS], axis=1)
+    out.append(rows.astype("<f8").tobytes())
+    out.append(slots[keep].astype("<i4").tobytes())
+    return b"".join(out)
+
+def restore(world, data):
+    player, level, camera = world.player, world.level, world.camera
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a version {VERSION} world snapshot")
+    pos = HEADER.size
+
+    values = WORLD.unpack_from(data, pos)
+    pos += WORLD.size
+    (world.time, world.ticks, world.game_over, world.spawn_timer,
+     world.fire_timer, world.fire_timer_reset) = values[:6]
+    for name, value in zip(world.TUNING, values[6:]):
+        setattr(world, name, value)
+
+    version, has_gauss, gauss, length = RNG.unpack_from(data, pos)
+    pos += RNG.size
+    state = little_endian(array("I", data[pos:pos + 4 * length]))
+    pos += 4 * length
+    world.rng.setstate((version, tuple(state), gauss if has_gauss else None))
+
+    (player.x, player.y, player.prev_x, player.prev_y, player.speed, player.hp, player.xp,
+     player.radius, player.max_hp, player.level, player.xp_to_next, player.kills,
+     player.xp_growth, player.invulnerable) = PLAYER.unpack_from(data, pos)
+    pos += PLAYER.size
+
+    nav_version, blocked = LEVEL.unpack_from(data, pos)
+    pos += LEVEL.size
+    cells = little_endian(array("i", data[pos:pos + 8 * blocked]))
+    pos += 8 * blocked
+    level.blocked = set(zip(cells[0::2], cells[1::2]))
+    level.nav_version = nav_version
+    world.flow.version = None  # rebuild the flow field on the next step
+    camera.x, camera.y = CAMERA.unpack_from(data, pos)
+    pos += CAMERA.size
+
+    enemies = world.enemies
+    (n,) = COUNT.unpack_from(data, pos)
+    pos += COUNT.size
+    columns = {}
+    for name in enemies.FIELDS:
+        columns[name] = np.frombuffer(data, dtype="<f8", count=n, offset=pos)
+        pos += 8 * n
+    enemies.restore(n, columns)
+    enemies.time = world.time
+    has_lod, lod_ticks, current = LOD.unpack_from(data, pos)
+    pos += LOD.size
+    if has_lod:
+        codes = np.frombuffer(data, dtype=np.uint8, count=n, offset=pos)
+        pos += n
+        if world.lod:
+            world.lod.set_region_codes(enemies, codes, lod_ticks, current)
+    else:
+        enemies.lod_time[:n] = enemies.time  # saved without LOD: every zombie was stepped up to now
+
+    (count,) = COUNT.unpack_from(data, pos)
+    pos += COUNT.size
+    width = len(FIREBALL_FIELDS)
+    rows = np.frombuffer(data, dtype="<f8", count=width * count, offset=pos).reshape(count, width)
+    pos += 8 * width * count
+    targets = np.frombuffer(data, dtype="<i4", count=count, offset=pos)
+    pos += 4 * count
+
+    fireballs, views = world.fireballs, enemies.views
+    fireballs.clear()
+    for slot in targets.tolist():
+        fireballs.spawn(0.0, 0.0, views[slot])
+    for i, name in enumerate(FIREBALL_FIELDS):
+        getattr(fireballs, name)[:count] = rows[:, i]
+    return world
+
+def save(world, path):
+    data = snapshot(world)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+def load(world, path):
+    with open(path, "rb") as f:
+        return restore(world, f.read())
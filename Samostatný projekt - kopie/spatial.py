@@ -0,0 +1,99 @@
+import numpy as np
+
+# === CELL INDEX ===
+# Uniform grid over position arrays. build() sorts the entity indices by
+# cell key in one vectorized pass; queries then binary-search the sorted
+# keys, so they only look at the cells they touch. Cells of one column are
+# contiguous in key space, a box query costs one search per column.
+class CellIndex:
+    SPAN = 1 << 24
+    OFFSET = 1 << 23
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.order = np.zeros(0, dtype=np.int64)
+        self.x = self.keys
+        self.y = self.keys
+
+    def __len__(self):
+        return len(self.order)
+
+    def cell_of(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def build(self, x, y):
+        cx = np.floor_divide(x, self.cell_size).astype(np.int64)
+        cy = np.floor_divide(y, self.cell_size).astype(np.int64)
+        keys = cx * self.SPAN + (cy + self.OFFSET)
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+        self.x = x
+        self.y = y
+
+    def _box(self, cx0, cy0, cx1, cy1):
+        keys = self.keys
+        parts = []
+        for cx in range(cx0, cx1 + 1):
+            base = cx * self.SPAN + self.OFFSET
+            lo = np.searchsorted(keys, base + cy0, "left")
+            hi = np.searchsorted(keys, base + cy1, "right")
+            if hi > lo:
+                parts.append(self.order[lo:hi])
+        if not parts:
+            return self.order[:0]
+        return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+    def query_radius(self, x, y, radius):
+        cx0, cy0 = self.cell_of(x - radius, y - radius)
+        cx1, cy1 = self.cell_of(x + radius, y + radius)
+        found = self._box(cx0, cy0, cx1, cy1)
+        if len(found) == 0:
+            return found
+        dx = self.x[found] - x
+        dy = self.y[found] - y
+        return found[dx * dx + dy * dy <= radius * radius]
+
+    def pairs(self, x, y, radius):
+        # Batch _box() for many query points at once: every (query, entity)
+        # pair whose cells overlap the query's box. Only 3 columns are
+        # searched, so radius must not exceed cell_size.
+        cs = self.cell_size
+        cx0 = np.floor_divide(x - radius, cs).astype(np.int64)
+        cx1 = np.floor_divide(x + radius, cs).astype(np.int64)
+        cy0 = np.floor_divide(y - radius, cs).astype(np.int64)
+        cy1 = np.floor_divide(y + radius, cs).astype(np.int64)
+        queries, los, his = [], [], []
+        for d in range(3):
+            cx = cx0 + d
+            ok = np.flatnonzero(cx <= cx1)
+            base = cx[ok] * self.SPAN + self.OFFSET
+            queries.append(ok)
+            los.append(np.searchsorted(self.keys, base + cy0[ok], "left"))
+            his.append(np.searchsorted(self.keys, base + cy1[ok], "right"))
+        query = np.concatenate(queries)
+        lo = np.concatenate(los)
+        counts = np.concatenate(his) - lo
+        # expand every [lo, hi) run into positions in the sorted order
+        starts = lo - (np.cumsum(counts) - counts)
+        pos = np.arange(int(counts.sum())) + np.repeat(starts, counts)
+        return np.repeat(query, counts), self.order[pos]
+
+    def nearest(self, x, y, k=1):
+        # Grow a square of cells around (x, y). Once it reaches R cells out,
+        # everything closer than R * cell_size is inside, so the k-th best
+        # candidate is final as soon as it is within that distance.
+        n = len(self.order)
+        if n == 0:
+            return self.order[:0]
+        k = min(k, n)
+        ccx, ccy = self.cell_of(x, y)
+        ring = 0
+        while True:
+            found = self._box(ccx - ring, ccy - ring, ccx + ring, ccy + ring)
+            if len(found) >= k:
+                dist = np.hypot(self.x[found] - x, self.y[found] - y)
+                best = np.argsort(dist, kind="stable")[:k]
+                if len(found) == n or dist[best[-1]] <= ring * self.cell_size:
+                    return found[best]
+            ring = ring * 2 if ring else 1